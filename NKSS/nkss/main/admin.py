@@ -1,13 +1,130 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import *
- 
-# Register your models here.
-admin.site.register(Player)
-admin.site.register(Match)
-admin.site.register(Goal)
-admin.site.register(Assist)
-admin.site.register(Card)
-admin.site.register(MatchEvent)
-admin.site.register(StaffMember)
-admin.site.register(Meeting)
-admin.site.register(Equipment)
+from .roster import deactivate_players, promote_players
+
+
+# Filtered changelists of the large tables skip the extra unfiltered COUNT(*)
+# and load the related rows used by __str__ in the same query; foreign keys
+# and lineups are edited through autocomplete widgets instead of selects
+# listing every player.
+
+@admin.register(Player)
+class PlayerAdmin(admin.ModelAdmin):
+    list_display = ('last_name', 'first_name', 'category', 'position', 'is_active_member', 'member_until')
+    list_filter = ('category', 'position', 'is_active_member')
+    search_fields = ('last_name', 'first_name')
+    ordering = ('category', 'last_name')
+    show_full_result_count = False
+    list_per_page = 50
+    actions = ['deactivate_selected']
+
+    @admin.action(description="Deaktiviraj odabrane igrače")
+    def deactivate_selected(self, request, queryset):
+        deactivated = deactivate_players(queryset)
+        self.message_user(request, f"Deaktivirano igrača: {len(deactivated)}.", messages.SUCCESS)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        for code, name in CATEGORIES:
+            action = promote_action(code)
+            actions[action.__name__] = (action, action.__name__, f"Premjesti u kategoriju {name}")
+        return actions
+
+
+def promote_action(category):
+    def action(modeladmin, request, queryset):
+        moved, errors = promote_players(queryset, category)
+        modeladmin.message_user(request, f"Premješteno igrača: {len(moved)}.", messages.SUCCESS)
+        for error in errors:
+            modeladmin.message_user(request, error, messages.WARNING)
+    action.__name__ = f'promote_to_{category.lower()}'
+    return action
+
+
+@admin.register(Match)
+class MatchAdmin(admin.ModelAdmin):
+    list_display = ('date', 'opponent', 'category', 'home_or_away', 'home_score', 'away_score')
+    list_filter = ('category', 'home_or_away')
+    search_fields = ('opponent',)
+    date_hierarchy = 'date'
+    ordering = ('-date',)
+    autocomplete_fields = ('starting_players', 'bench_players', 'captain', 'goalkeeper')
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('match', 'player', 'minute')
+    list_select_related = ('match', 'player')
+    list_filter = ('match__category',)
+    search_fields = ('player__last_name', 'match__opponent')
+    date_hierarchy = 'match__date'
+    ordering = ('-match__date', 'minute')
+    autocomplete_fields = ('match', 'player')
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(Goal)
+class GoalAdmin(EventAdmin):
+    pass
+
+
+@admin.register(Assist)
+class AssistAdmin(EventAdmin):
+    pass
+
+
+@admin.register(Card)
+class CardAdmin(EventAdmin):
+    list_display = ('match', 'player', 'card_type', 'minute')
+    list_filter = ('card_type', 'match__category')
+
+
+@admin.register(MatchEvent)
+class MatchEventAdmin(EventAdmin):
+    list_display = ('match', 'player')
+    ordering = ('-match__date',)
+
+
+@admin.register(MatchEventLog)
+class MatchEventLogAdmin(admin.ModelAdmin):
+    # Dnevnik se samo nadopunjuje; ispravci su novi zapisi s negativnom deltom.
+    list_display = ('created_at', 'match', 'player', 'event_type', 'minute', 'delta')
+    list_select_related = ('match', 'player')
+    list_filter = ('event_type',)
+    search_fields = ('player__last_name', 'match__opponent')
+    ordering = ('-pk',)
+    show_full_result_count = False
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StaffMember)
+class StaffMemberAdmin(admin.ModelAdmin):
+    list_display = ('name', 'role', 'email', 'phone', 'active')
+    list_filter = ('role', 'active')
+    search_fields = ('name',)
+
+
+@admin.register(Meeting)
+class MeetingAdmin(admin.ModelAdmin):
+    list_display = ('date', 'title')
+    search_fields = ('title',)
+    date_hierarchy = 'date'
+    filter_horizontal = ('attendees',)
+
+
+@admin.register(Equipment)
+class EquipmentAdmin(admin.ModelAdmin):
+    list_display = ('name', 'type', 'quantity', 'condition', 'purchase_date')
+    list_filter = ('type',)
+    search_fields = ('name',)
@@ -0,0 +1,23 @@
+from django.utils import timezone
+
+from .events import current_batch
+from .models import Match
+
+
+def match_cache_version(match):
+    """Fragment version of a match, used in cached template keys.
+
+    It is the match's ``updated_at``, which every change to the match, its
+    lineup or its events moves (see touch_matches), so all workers agree on
+    the key even when each keeps its own in-memory cache.
+    """
+    return match.updated_at.isoformat() if match.updated_at else ''
+
+
+def touch_matches(*match_ids):
+    """Move ``updated_at`` of the given matches, retiring their cached fragments."""
+    batch = current_batch()
+    if batch is not None:
+        batch.match_ids.update(match_ids)
+    elif match_ids:
+        Match.objects.filter(pk__in=match_ids).update(updated_at=timezone.now())
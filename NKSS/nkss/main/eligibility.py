@@ -0,0 +1,147 @@
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+
+from .models import CATEGORIES, Player, PlayerCategoryHistory, PlayerEligibility
+
+CATEGORY_ORDER = [code for code, name in CATEGORIES]
+
+CATEGORY_AGE_LIMITS = {
+    'U9': 9,
+    'U11': 11,
+    'MP': 13,
+    'SP': 15,
+    'JUN': 18,
+    'SEN': 50,
+    'VET': 100,
+}
+
+# Donja dobna granica kategorija koje se ne odvajaju gornjom granicom mlađih.
+CATEGORY_MIN_AGES = {
+    'VET': 35,
+}
+
+# Osim u svojoj dobnoj kategoriji igrač smije nastupati najviše jednu kategoriju više.
+PLAYING_UP = 1
+
+# Sezona počinje 1. srpnja; dob igrača za sve kategorije računa se na taj dan.
+SEASON_START = (7, 1)
+
+
+def age_on(date_of_birth, day):
+    return day.year - date_of_birth.year - ((day.month, day.day) < (date_of_birth.month, date_of_birth.day))
+
+
+def season_cutoff(day=None):
+    """First day of the season containing ``day`` (default today)."""
+    day = day or date.today()
+    start = date(day.year, *SEASON_START)
+    return start if day >= start else date(day.year - 1, *SEASON_START)
+
+
+def age_category(age):
+    """Youngest category whose age limit ``age`` is not over."""
+    return next((code for code in CATEGORY_ORDER if age <= CATEGORY_AGE_LIMITS[code]), CATEGORY_ORDER[-1])
+
+
+def eligible_categories(date_of_birth, lowest_category, cutoff):
+    """Categories open to a player on the cutoff date: from their age
+    category (or an older one they already played in) up to PLAYING_UP
+    categories above it, within each category's age bounds."""
+    lowest = CATEGORY_ORDER.index(lowest_category) if lowest_category else 0
+    if not date_of_birth:
+        return CATEGORY_ORDER[lowest:lowest + PLAYING_UP + 1]
+    age = age_on(date_of_birth, cutoff)
+    own = CATEGORY_ORDER.index(age_category(age))
+    return [
+        code for code in CATEGORY_ORDER[max(own, lowest):max(own + PLAYING_UP, lowest) + 1]
+        if CATEGORY_MIN_AGES.get(code, 0) <= age <= CATEGORY_AGE_LIMITS[code]
+    ]
+
+
+def eligibility_rows(players, history, cutoffs):
+    """``(player_id, cutoff, category)`` for every category open to the players.
+
+    ``players`` are ``(pk, date_of_birth, category)`` rows and ``history``
+    ``(player_id, category)`` rows; both are read once.
+    """
+    players = list(players)
+    lowest = defaultdict(lambda: None)
+    for player_id, category in [(pk, category) for pk, dob, category in players] + list(history):
+        if category and (lowest[player_id] is None
+                         or CATEGORY_ORDER.index(category) > CATEGORY_ORDER.index(lowest[player_id])):
+            lowest[player_id] = category
+    return [
+        (pk, cutoff, category)
+        for cutoff in cutoffs
+        for pk, date_of_birth, current in players
+        for category in eligible_categories(date_of_birth, lowest[pk], cutoff)
+    ]
+
+
+def roster_inputs(player_ids=None):
+    players = Player.objects.values_list('pk', 'date_of_birth', 'category')
+    history = PlayerCategoryHistory.objects.values_list('player_id', 'category')
+    if player_ids is not None:
+        players = players.filter(pk__in=player_ids)
+        history = history.filter(player__in=player_ids)
+    return players, history
+
+
+def refresh_eligibility(player_ids=None, cutoffs=None):
+    """Rebuild PlayerEligibility for the given players (default all) and seasons.
+
+    Without ``cutoffs`` every season already in the table is rebuilt; a full
+    refresh (all players) also adds the current season. The roster and
+    category history are read once, the rows are computed in a single pass
+    and replaced with one DELETE and bulk INSERTs.
+    """
+    if cutoffs is None:
+        cutoffs = set(PlayerEligibility.objects.values_list('season_cutoff', flat=True).distinct())
+        if player_ids is None:
+            cutoffs.add(season_cutoff())
+    if not cutoffs:
+        return 0
+    players, history = roster_inputs(player_ids)
+    stale = PlayerEligibility.objects.filter(season_cutoff__in=cutoffs)
+    if player_ids is not None:
+        stale = stale.filter(player__in=player_ids)
+
+    with transaction.atomic():
+        rows = [
+            PlayerEligibility(player_id=pk, season_cutoff=cutoff, category=category)
+            for pk, cutoff, category in eligibility_rows(players, history, cutoffs)
+        ]
+        stale.delete()
+        PlayerEligibility.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return len(rows)
+
+
+def season_exists(cutoff):
+    return PlayerEligibility.objects.filter(season_cutoff=cutoff).exists()
+
+
+def rule_eligible_ids(category, cutoff, player_ids=None):
+    """Players the rule lets play ``category`` in a season missing from the table.
+
+    Nothing is written: the season is added by the refresh_eligibility
+    command, after which the indexed lookup takes over.
+    """
+    players, history = roster_inputs(player_ids)
+    return [pk for pk, season, code in eligibility_rows(players, history, [cutoff]) if code == category]
+
+
+def eligible_player_ids(category, day=None):
+    """Indexed lookup of the players eligible for ``category`` on ``day``."""
+    cutoff = season_cutoff(day)
+    if not season_exists(cutoff):
+        return rule_eligible_ids(category, cutoff)
+    return PlayerEligibility.objects.filter(season_cutoff=cutoff, category=category).values('player')
+
+
+def is_eligible(player_id, category, day=None):
+    cutoff = season_cutoff(day)
+    if not season_exists(cutoff):
+        return player_id in rule_eligible_ids(category, cutoff, [player_id])
+    return PlayerEligibility.objects.filter(season_cutoff=cutoff, category=category, player=player_id).exists()
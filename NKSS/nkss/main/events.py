@@ -0,0 +1,227 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import COUNTER_FIELDS, Assist, Card, Goal, Match, MatchEventLog, Player, ProjectionCheckpoint
+
+PLAYER_COUNTERS = 'player_counters'
+
+_local = threading.local()
+
+
+def log_entry(match_id, player_id, event_type, minute=None, delta=1):
+    return MatchEventLog(match_id=match_id, player_id=player_id, event_type=event_type, minute=minute, delta=delta)
+
+
+def lock_checkpoint():
+    checkpoints = ProjectionCheckpoint.objects.select_for_update()
+    try:
+        return checkpoints.get(name=PLAYER_COUNTERS)
+    except ProjectionCheckpoint.DoesNotExist:
+        ProjectionCheckpoint.objects.get_or_create(name=PLAYER_COUNTERS)
+        return checkpoints.get(name=PLAYER_COUNTERS)
+
+
+def record_events(entries):
+    """Append entries to the log; the player counters follow after commit.
+
+    The write itself only locks the checkpoint row and inserts the entries;
+    the lock makes concurrent writers commit their entries in id order, so
+    the projection never skips one. Inside batched_events() the entries are
+    only collected and written once at the end of the block.
+    """
+    entries = [entry for entry in entries if entry.delta]
+    if not entries:
+        return []
+    batch = current_batch()
+    if batch is not None:
+        batch.entries.extend(entries)
+        return entries
+    with transaction.atomic():
+        lock_checkpoint()
+        MatchEventLog.objects.bulk_create(entries)
+        _local.projection_pending = True
+        transaction.on_commit(project_pending, robust=True)
+    return entries
+
+
+def project_pending():
+    # Every write of a transaction registers this hook; the first one to run
+    # after commit projects all of them and the rest find nothing pending.
+    # After a rollback the flag stays set and the next commit projects.
+    # If the projection fails, the entries stay in the log for the next
+    # projection or replay_event_log.
+    if getattr(_local, 'projection_pending', False):
+        project()
+
+
+class EventBatch:
+    def __init__(self):
+        self.entries = []
+        self.match_ids = set()
+
+
+def current_batch():
+    return getattr(_local, 'batch', None)
+
+
+@contextmanager
+def batched_events():
+    """Write the log entries and match touches of the block once, at its end.
+
+    Event and lineup signals inside the block only add to the batch, so
+    deleting or saving many events costs one log insert and one Match
+    update instead of one of each per event.
+    """
+    if current_batch() is not None:
+        yield current_batch()
+        return
+    from .caching import touch_matches
+    batch = _local.batch = EventBatch()
+    try:
+        with transaction.atomic():
+            yield batch
+            _local.batch = None
+            record_events(batch.entries)
+            touch_matches(*batch.match_ids)
+    finally:
+        _local.batch = None
+
+
+def apply_counter_deltas(deltas):
+    """Add ``{player_id: {counter: delta}}`` to Player with a single UPDATE."""
+    updates = {}
+    for field in COUNTER_FIELDS.values():
+        whens = [When(pk=player_id, then=Value(counters[field]))
+                 for player_id, counters in deltas.items() if counters.get(field)]
+        if whens:
+            updates[field] = Greatest(F(field) + Case(*whens, default=Value(0)), Value(0))
+    if updates:
+        Player.objects.filter(pk__in=list(deltas)).update(updated_at=timezone.now(), **updates)
+
+
+def project(checkpoint=None):
+    """Incremental replay: apply log entries newer than the checkpoint."""
+    _local.projection_pending = False
+    with transaction.atomic():
+        checkpoint = checkpoint or lock_checkpoint()
+        pending = (
+            MatchEventLog.objects.filter(pk__gt=checkpoint.last_event_id)
+            .values('player', 'event_type')
+            .annotate(total=Sum('delta'), last=Max('pk'))
+            .order_by()
+        )
+        deltas = defaultdict(dict)
+        last_event_id = checkpoint.last_event_id
+        for row in pending:
+            deltas[row['player']][COUNTER_FIELDS[row['event_type']]] = row['total']
+            last_event_id = max(last_event_id, row['last'])
+        apply_counter_deltas(deltas)
+        if last_event_id != checkpoint.last_event_id:
+            checkpoint.last_event_id = last_event_id
+            checkpoint.save(update_fields=['last_event_id'])
+    return len(deltas)
+
+
+def log_counters(player_ids=None):
+    """Counters as the full log defines them, ``{player_id: {counter: total}}``."""
+    log = MatchEventLog.objects.all()
+    if player_ids is not None:
+        log = log.filter(player__in=player_ids)
+    totals = defaultdict(dict)
+    for row in log.values('player', 'event_type').annotate(total=Sum('delta')).order_by():
+        totals[row['player']][COUNTER_FIELDS[row['event_type']]] = row['total']
+    return totals
+
+
+def rebuild(player_ids=None):
+    """Full replay: recompute the counters of the given (or all) players from the log."""
+    fields = list(COUNTER_FIELDS.values())
+    with transaction.atomic():
+        project(lock_checkpoint())
+        players = Player.objects.only('pk', *fields)
+        if player_ids is not None:
+            players = players.filter(pk__in=player_ids)
+        totals = log_counters(player_ids)
+
+        players = list(players)
+        for player in players:
+            for field in fields:
+                setattr(player, field, max(totals[player.pk].get(field, 0), 0))
+        Player.objects.bulk_update(players, fields, batch_size=500)
+    return len(players)
+
+
+def source_counters(player_ids=None):
+    """Counters recomputed from the event tables, one grouped query per table."""
+    totals = defaultdict(dict)
+    sources = [
+        (Goal.objects.values('player'), lambda row: 'goals'),
+        (Assist.objects.values('player'), lambda row: 'assists'),
+        (Card.objects.filter(card_type__in=['Y', 'R']).values('player', 'card_type'),
+         lambda row: 'yellow_cards' if row['card_type'] == 'Y' else 'red_cards'),
+    ]
+    for queryset, field in sources:
+        if player_ids is not None:
+            queryset = queryset.filter(player__in=player_ids)
+        for row in queryset.annotate(total=Count('pk')).order_by():
+            totals[row['player']][field(row)] = row['total']
+    for through in (Match.starting_players.through, Match.bench_players.through):
+        queryset = through.objects.values('player')
+        if player_ids is not None:
+            queryset = queryset.filter(player__in=player_ids)
+        for row in queryset.annotate(total=Count('pk')).order_by():
+            counters = totals[row['player']]
+            counters['appearances'] = counters.get('appearances', 0) + row['total']
+    return totals
+
+
+def reconcile(player_ids=None, commit=True):
+    """Compare the counters with the event tables and repair the drifted players.
+
+    Returns ``[(player, {counter: (stored, actual)})]``. Repairs are written
+    with one bulk_update; where the log itself disagrees with the event
+    tables a correction entry without a match is appended, so a later full
+    replay arrives at the same values.
+    """
+    fields = list(COUNTER_FIELDS.values())
+    event_types = {field: event_type for event_type, field in COUNTER_FIELDS.items()}
+    with transaction.atomic():
+        checkpoint = lock_checkpoint()
+        project(checkpoint)
+        players = Player.objects.only('pk', 'first_name', 'last_name', 'updated_at', *fields).order_by('pk')
+        if player_ids is not None:
+            players = players.filter(pk__in=player_ids)
+        actual = source_counters(player_ids)
+        logged = log_counters(player_ids)
+
+        drifted, corrections = [], []
+        for player in players:
+            changes = {}
+            for field in fields:
+                value = actual[player.pk].get(field, 0)
+                if getattr(player, field) != value:
+                    changes[field] = (getattr(player, field), value)
+                    setattr(player, field, value)
+                difference = value - logged[player.pk].get(field, 0)
+                if difference:
+                    corrections.append(log_entry(None, player.pk, event_types[field], delta=difference))
+            if changes:
+                drifted.append((player, changes))
+
+        if commit and corrections:
+            MatchEventLog.objects.bulk_create(corrections, batch_size=1000)
+            checkpoint.last_event_id = MatchEventLog.objects.aggregate(last=Max('pk'))['last']
+            checkpoint.save(update_fields=['last_event_id'])
+        if commit and drifted:
+            now = timezone.now()
+            for player, changes in drifted:
+                player.updated_at = now
+            Player.objects.bulk_update([player for player, changes in drifted], fields + ['updated_at'],
+                                       batch_size=500)
+    return drifted
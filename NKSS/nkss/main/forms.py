@@ -2,6 +2,8 @@ from datetime import date
 from django.utils import timezone
 from django import forms
 from .models import *
+from .eligibility import is_eligible
+from .roster import category_error
 from django.core.exceptions import ValidationError
 
 class PlayerForm(forms.ModelForm):
@@ -59,30 +61,17 @@ class PlayerForm(forms.ModelForm):
     def clean_category(self):
         category = self.cleaned_data.get('category')
         dob = self.cleaned_data.get('date_of_birth')
-        if self.instance.pk:  
-            history = self.instance.category_history.all().values_list('category', flat=True)
-            previous_categories = set(history)
-            cat_order = [c[0] for c in CATEGORIES]
-            current_index = cat_order.index(category)
-            for prev_cat in previous_categories:
-                if cat_order.index(prev_cat) > current_index:
-                    raise forms.ValidationError(f"Igrač se ne može vratiti u mlađu kategoriju ({dict(CATEGORIES)[prev_cat]} > {dict(CATEGORIES)[category]}).")
-        if not category or not dob:
-            return category  
-        today = date.today()
-        age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-        category_age_limits = {
-            'U9': 9,
-            'U11': 11,
-            'MP': 13,
-            'SP': 15,
-            'JUN': 18,
-            'SEN': 50,  
-            'VET': 100,
-        }
-        max_age = category_age_limits.get(category)
-        if age > max_age:
-            raise forms.ValidationError(f"Igrač je prestar za kategoriju '{dict(CATEGORIES).get(category)}'.")
+        # Unchanged birth date: the precomputed eligibility table answers with
+        # one indexed lookup; the history is only loaded to explain a refusal.
+        if category and self.instance.pk and dob == self.instance.date_of_birth \
+                and is_eligible(self.instance.pk, category):
+            return category
+        previous_categories = set()
+        if self.instance.pk:
+            previous_categories = set(self.instance.category_history.values_list('category', flat=True))
+        error = category_error(category, dob, previous_categories)
+        if error:
+            raise forms.ValidationError(error)
         return category
 
     def save(self, commit=True):
@@ -151,7 +140,14 @@ class MatchForm(forms.ModelForm):
         elif self.initial.get('category'):
             category = self.initial.get('category')
         if category:
-            players = Player.objects.filter(category=category).order_by('last_name', 'first_name')
+            players = Player.objects.eligible_on(self.match_day(), category)
+            if self.instance.pk:
+                # Igrači već upisani u utakmicu ostaju izborni i kad su u
+                # međuvremenu promaknuti ili izgubili pravo nastupa.
+                players = players | Player.objects.in_lineup(self.instance) | Player.objects.filter(
+                    pk__in=[self.instance.captain_id, self.instance.goalkeeper_id]
+                )
+            players = players.order_by('last_name', 'first_name')
             self.fields['starting_players'].queryset = players
             self.fields['bench_players'].queryset = players
             self.fields['captain'].queryset = players
@@ -166,6 +162,17 @@ class MatchForm(forms.ModelForm):
             self.fields['captain'].queryset = Player.objects.none()
             self.fields['goalkeeper'].queryset = Player.objects.none()
 
+    def match_day(self):
+        """Day the lineup must be eligible on: the submitted date, else the saved one, else today."""
+        if self.is_bound:
+            try:
+                day = self.fields['date'].to_python(self.data.get('date'))
+            except ValidationError:
+                day = None
+            if day:
+                return day
+        return self.instance.date or timezone.localdate()
+
     def clean(self):
         cleaned_data = super().clean()
         category = cleaned_data.get("category")
@@ -298,6 +305,21 @@ class CardEventForm(forms.Form):
         super().__init__(*args, **kwargs)
         self.fields['player'].queryset = valid_players
         
+class BatchEventForm(forms.Form):
+    """One event of a batch posted to add_events; players are checked for the whole batch at once."""
+    TYPES = [('goal', 'Gol'), ('assist', 'Asistencija'), ('card', 'Karton')]
+
+    type = forms.ChoiceField(choices=TYPES)
+    player = forms.IntegerField(min_value=1)
+    minute = forms.IntegerField(min_value=1, max_value=90)
+    card_type = forms.ChoiceField(choices=CARD_TYPES, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('type') == 'card' and not cleaned_data.get('card_type'):
+            self.add_error('card_type', "Odaberite vrstu kartona.")
+        return cleaned_data
+
 GoalFormSet = forms.formset_factory(GoalEventForm, extra=1, max_num=20, can_delete=True)
 AssistFormSet = forms.formset_factory(AssistEventForm, extra=1, max_num=20, can_delete=True)
 CardFormSet = forms.formset_factory(CardEventForm, extra=1, max_num=30, can_delete=True)
@@ -0,0 +1,74 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from main.models import Match, Player
+
+
+def parse_target(value):
+    name, sep, url = value.partition('=')
+    if not sep or not url.startswith('http'):
+        raise ValueError(value)
+    return name, url.rstrip('/')
+
+
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except (HTTPError, URLError, TimeoutError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+class Command(BaseCommand):
+    help = (
+        "Mjeri propusnost stranica za čitanje (statistika, igrači, utakmice) na pokrenutim poslužiteljima. "
+        "Primjer: uvicorn nkss.asgi:application --port 8001 i gunicorn nkss.wsgi --threads 8 --bind :8000, "
+        "zatim benchmark_pages --target asgi=http://127.0.0.1:8001 --target wsgi=http://127.0.0.1:8000."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', type=parse_target, action='append', required=True,
+                            help="NAZIV=URL poslužitelja, npr. asgi=http://127.0.0.1:8001 (može više puta).")
+        parser.add_argument('--requests', type=int, default=200, help="Broj zahtjeva po stranici.")
+        parser.add_argument('--concurrency', type=int, default=20, help="Broj istovremenih zahtjeva.")
+
+    def pages(self):
+        player = Player.objects.order_by('pk').first()
+        match = Match.objects.order_by('-date').first()
+        if player is None or match is None:
+            raise CommandError("Baza mora imati barem jednog igrača i jednu utakmicu.")
+        return {
+            'stats_dashboard': reverse('main:stats_dashboard'),
+            'player_list': reverse('main:player_list'),
+            'player_detail': reverse('main:player_detail', args=[player.pk]),
+            'match_list': reverse('main:match_list'),
+            'match_detail': reverse('main:match_detail', args=[match.pk]),
+        }
+
+    def handle(self, *args, **options):
+        pages = self.pages()
+        self.stdout.write(f"{'poslužitelj':<12} {'stranica':<16} {'zahtj/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'greške':>7}")
+        for name, base_url in options['target']:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                for page, path in pages.items():
+                    fetch(base_url + path)
+                    start = time.perf_counter()
+                    results = list(pool.map(fetch, [base_url + path] * options['requests']))
+                    elapsed = time.perf_counter() - start
+
+                    latencies = sorted(latency * 1000 for latency, ok in results)
+                    errors = sum(1 for latency, ok in results if not ok)
+                    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                    self.stdout.write(
+                        f"{name:<12} {page:<16} {len(results) / elapsed:>9.1f} "
+                        f"{statistics.median(latencies):>8.1f} {p95:>8.1f} {errors:>7}"
+                    )
@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import CATEGORIES, Player
+from main.roster import deactivate_players
+
+
+class Command(BaseCommand):
+    help = "Deaktivira članove kojima je isteklo članstvo ili odabrane igrače."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lapsed', action='store_true',
+                            help="Deaktiviraj aktivne članove kojima je 'Član do' u prošlosti.")
+        parser.add_argument('--category', choices=[code for code, name in CATEGORIES])
+        parser.add_argument('--ids', type=int, nargs='+', help="ID-evi igrača za deaktivaciju.")
+        parser.add_argument('--until', type=date.fromisoformat,
+                            help="Datum završetka članstva (YYYY-MM-DD), zadano danas.")
+
+    def handle(self, *args, **options):
+        if not (options['lapsed'] or options['category'] or options['ids']):
+            raise CommandError("Navedite --lapsed, --category ili --ids.")
+        players = Player.objects.all()
+        if options['lapsed']:
+            players = players.filter(member_until__lt=date.today())
+        if options['category']:
+            players = players.filter(category=options['category'])
+        if options['ids']:
+            players = players.filter(pk__in=options['ids'])
+
+        deactivated = deactivate_players(players, until=options['until'])
+        self.stdout.write(self.style.SUCCESS(f"Deaktivirano igrača: {len(deactivated)}."))
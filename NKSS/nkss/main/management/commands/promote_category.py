@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import CATEGORIES, Player
+from main.roster import promote_players
+
+
+class Command(BaseCommand):
+    help = "Premješta sve igrače jedne kategorije u drugu (prijelaz sezone)."
+
+    def add_arguments(self, parser):
+        codes = [code for code, name in CATEGORIES]
+        parser.add_argument('from_category', choices=codes)
+        parser.add_argument('to_category', choices=codes)
+        parser.add_argument('--born-before', type=date.fromisoformat,
+                            help="Premjesti samo igrače rođene prije ovog datuma (YYYY-MM-DD).")
+        parser.add_argument('--active-only', action='store_true', help="Preskoči neaktivne članove.")
+
+    def handle(self, *args, **options):
+        if options['from_category'] == options['to_category']:
+            raise CommandError("Kategorije moraju biti različite.")
+        players = Player.objects.filter(category=options['from_category'])
+        if options['born_before']:
+            players = players.filter(date_of_birth__lt=options['born_before'])
+        if options['active_only']:
+            players = players.filter(is_active_member=True)
+
+        moved, errors = promote_players(players, options['to_category'])
+        for error in errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(f"Premješteno igrača: {len(moved)}, preskočeno: {len(errors)}."))
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from main.events import reconcile
+from main.models import Match, MatchEventLog, Player
+
+
+def touched_players(since):
+    # Igrači izmijenjeni od zadanog trenutka, igrači u izmijenjenim utakmicama
+    # (događaji i sastavi osvježavaju Match.updated_at) i igrači iz novih zapisa dnevnika.
+    matches = Match.objects.filter(updated_at__gte=since).values('pk')
+    ids = set(Player.objects.filter(updated_at__gte=since).values_list('pk', flat=True))
+    ids.update(Player.objects.filter(
+        Q(starts__in=matches) | Q(bench__in=matches) | Q(goals_scored__match__in=matches)
+        | Q(assists_made__match__in=matches) | Q(cards_received__match__in=matches)
+    ).values_list('pk', flat=True))
+    ids.update(MatchEventLog.objects.filter(created_at__gte=since).values_list('player', flat=True))
+    return ids
+
+
+class Command(BaseCommand):
+    help = "Uspoređuje brojače igrača s golovima, asistencijama, kartonima i sastavima te ispravlja odstupanja."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=datetime.fromisoformat,
+                            help="Provjeri samo igrače izmijenjene od tog trenutka (YYYY-MM-DD[THH:MM]).")
+        parser.add_argument('--dry-run', action='store_true', help="Samo prijavi odstupanja, bez ispravka.")
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if since and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        player_ids = touched_players(since) if since else None
+        drifted = reconcile(player_ids, commit=not options['dry_run'])
+
+        for player, changes in drifted:
+            details = ", ".join(f"{field} {stored} → {actual}" for field, (stored, actual) in changes.items())
+            self.stdout.write(f"{player}: {details}")
+        checked = len(player_ids) if player_ids is not None else Player.objects.count()
+        action = "pronađeno" if options['dry_run'] else "ispravljeno"
+        self.stdout.write(self.style.SUCCESS(
+            f"Provjereno igrača: {checked}, {action} odstupanja: {len(drifted)}."
+        ))
@@ -0,0 +1,20 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from main.eligibility import SEASON_START, refresh_eligibility
+
+
+class Command(BaseCommand):
+    help = "Ponovno izračunava kategorije u kojima igrači smiju nastupati po sezonama."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, nargs='+',
+                            help="Godina početka sezone (npr. 2025 za 2025/26); zadano sve postojeće, "
+                                 "a bez --ids i tekuća.")
+        parser.add_argument('--ids', type=int, nargs='+', help="ID-evi igrača; zadano svi.")
+
+    def handle(self, *args, **options):
+        cutoffs = [date(year, *SEASON_START) for year in options['season']] if options['season'] else None
+        count = refresh_eligibility(options['ids'], cutoffs)
+        self.stdout.write(self.style.SUCCESS(f"Zapisano prava nastupa: {count}."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from main.events import project, rebuild
+
+
+class Command(BaseCommand):
+    help = "Primjenjuje dnevnik događaja na brojače igrača (golovi, asistencije, kartoni, nastupi)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help="Ponovno izračunaj brojače iz cijelog dnevnika umjesto samo novih zapisa.")
+        parser.add_argument('--ids', type=int, nargs='+', help="ID-evi igrača za potpuni izračun (uz --full).")
+
+    def handle(self, *args, **options):
+        if options['full']:
+            count = rebuild(options['ids'])
+            self.stdout.write(self.style.SUCCESS(f"Ponovno izračunati brojači igrača: {count}."))
+        else:
+            count = project()
+            self.stdout.write(self.style.SUCCESS(f"Ažurirani brojači igrača: {count}."))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='match',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['category', 'date'], name='main_match_categor_5b2c98_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['category', 'last_name'], name='main_player_categor_701c19_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:25
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Max
+
+COUNTER_FIELDS = {
+    'GOAL': 'goals',
+    'ASSIST': 'assists',
+    'YELLOW': 'yellow_cards',
+    'RED': 'red_cards',
+    'APPEARANCE': 'appearances',
+}
+
+
+def seed_event_log(apps, schema_editor):
+    # Postojeći golovi, asistencije, kartoni i sastavi postaju početni zapisi
+    # dnevnika, a brojači igrača se poravnavaju s njima.
+    Goal = apps.get_model('main', 'Goal')
+    Assist = apps.get_model('main', 'Assist')
+    Card = apps.get_model('main', 'Card')
+    Match = apps.get_model('main', 'Match')
+    Player = apps.get_model('main', 'Player')
+    MatchEventLog = apps.get_model('main', 'MatchEventLog')
+    ProjectionCheckpoint = apps.get_model('main', 'ProjectionCheckpoint')
+
+    rows = []
+    for model, event_type in ((Goal, 'GOAL'), (Assist, 'ASSIST')):
+        rows += [(match_id, player_id, event_type, minute)
+                 for match_id, player_id, minute in model.objects.values_list('match_id', 'player_id', 'minute')]
+    card_events = {'Y': 'YELLOW', 'R': 'RED'}
+    rows += [(match_id, player_id, card_events[card_type], minute)
+             for match_id, player_id, card_type, minute
+             in Card.objects.values_list('match_id', 'player_id', 'card_type', 'minute')
+             if card_type in card_events]
+    for through in (Match.starting_players.through, Match.bench_players.through):
+        rows += [(match_id, player_id, 'APPEARANCE', None)
+                 for match_id, player_id in through.objects.values_list('match_id', 'player_id')]
+
+    MatchEventLog.objects.bulk_create([
+        MatchEventLog(match_id=match_id, player_id=player_id, event_type=event_type, minute=minute)
+        for match_id, player_id, event_type, minute in rows
+    ], batch_size=1000)
+
+    totals = defaultdict(lambda: defaultdict(int))
+    for match_id, player_id, event_type, minute in rows:
+        totals[player_id][COUNTER_FIELDS[event_type]] += 1
+    players = list(Player.objects.only('pk', *COUNTER_FIELDS.values()))
+    for player in players:
+        for field in COUNTER_FIELDS.values():
+            setattr(player, field, totals[player.pk][field])
+    Player.objects.bulk_update(players, list(COUNTER_FIELDS.values()), batch_size=500)
+
+    last_event_id = MatchEventLog.objects.aggregate(last=Max('pk'))['last'] or 0
+    ProjectionCheckpoint.objects.create(name='player_counters', last_event_id=last_event_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MatchEventLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('GOAL', 'Gol'), ('ASSIST', 'Asistencija'), ('YELLOW', 'Žuti karton'), ('RED', 'Crveni karton'), ('APPEARANCE', 'Nastup')], max_length=10)),
+                ('minute', models.PositiveIntegerField(blank=True, null=True)),
+                ('delta', models.SmallIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('match', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='event_log', to='main.match')),
+                ('player', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='event_log', to='main.player')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player', 'event_type'], name='main_matche_player__c92e04_idx'), models.Index(fields=['match'], name='main_matche_match_i_7ef6b6_idx')],
+            },
+        ),
+        migrations.RunPython(seed_event_log, migrations.RunPython.noop),
+    ]
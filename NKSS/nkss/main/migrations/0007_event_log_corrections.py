@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_match_event_log'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='matcheventlog',
+            name='match',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='event_log', to='main.match'),
+        ),
+    ]
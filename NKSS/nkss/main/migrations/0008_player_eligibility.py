@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_event_log_corrections'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerEligibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season_cutoff', models.DateField()),
+                ('category', models.CharField(choices=[('U9', 'U9'), ('U11', 'U11'), ('MP', 'Mlađi pioniri'), ('SP', 'Stariji pioniri'), ('JUN', 'Juniori'), ('SEN', 'Seniori'), ('VET', 'Veterani')], max_length=3)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligibility', to='main.player')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('season_cutoff', 'category', 'player'), name='unique_player_eligibility')],
+            },
+        ),
+    ]
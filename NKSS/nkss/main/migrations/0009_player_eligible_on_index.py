@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_player_eligibility'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['category', 'is_active_member', 'member_since', 'member_until'], name='main_player_categor_d8220e_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from main.eligibility import eligibility_rows, season_cutoff
+
+
+def seed_player_eligibility(apps, schema_editor):
+    # Prava nastupa za tekuću sezonu (od 1. srpnja). Pravilo se ne kopira ovamo:
+    # eligibility_rows radi samo nad n-torkama, pa ga povijesni modeli mogu
+    # koristiti, a sjeme uvijek odgovara naredbi refresh_eligibility.
+    Player = apps.get_model('main', 'Player')
+    PlayerCategoryHistory = apps.get_model('main', 'PlayerCategoryHistory')
+    PlayerEligibility = apps.get_model('main', 'PlayerEligibility')
+
+    rows = eligibility_rows(
+        Player.objects.values_list('pk', 'date_of_birth', 'category'),
+        PlayerCategoryHistory.objects.values_list('player_id', 'category'),
+        [season_cutoff()],
+    )
+    PlayerEligibility.objects.bulk_create([
+        PlayerEligibility(player_id=pk, season_cutoff=cutoff, category=category)
+        for pk, cutoff, category in rows
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_player_eligible_on_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_player_eligibility, migrations.RunPython.noop),
+    ]
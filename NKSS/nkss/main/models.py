@@ -23,6 +23,45 @@ CARD_TYPES = [
     ('R', 'Crveni karton'),
 ]
 
+# Vrsta događaja u dnevniku -> brojač na Playeru koji iz njega proizlazi.
+COUNTER_FIELDS = {
+    'GOAL': 'goals',
+    'ASSIST': 'assists',
+    'YELLOW': 'yellow_cards',
+    'RED': 'red_cards',
+    'APPEARANCE': 'appearances',
+}
+
+class PlayerQuerySet(models.QuerySet):
+    def eligible_on(self, day, category=None):
+        """Players who may play on ``day``: active members whose membership
+        window covers the day and, given ``category``, who are registered in
+        it and eligible for it that season (PlayerEligibility)."""
+        players = self.filter(
+            models.Q(member_until__isnull=True) | models.Q(member_until__gte=day),
+            is_active_member=True,
+            member_since__lte=day,
+        )
+        if category:
+            from .eligibility import eligible_player_ids
+            players = players.filter(category=category, pk__in=eligible_player_ids(category, day))
+        return players
+
+    def in_lineup(self, match):
+        """Starters and substitutes of ``match``, without joining both M2M tables."""
+        return self.filter(
+            models.Q(pk__in=Match.starting_players.through.objects.filter(match=match).values('player'))
+            | models.Q(pk__in=Match.bench_players.through.objects.filter(match=match).values('player'))
+        )
+
+    def eligible_ids(self, ids, day, category=None):
+        """The subset of ``ids`` that is eligible_on(day, category), checked in one query."""
+        ids = {int(pk) for pk in ids if str(pk).isdigit()}
+        if not ids:
+            return set()
+        return set(self.eligible_on(day, category).filter(pk__in=ids).values_list('pk', flat=True))
+
+
 class Player(models.Model):
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
@@ -37,6 +76,15 @@ class Player(models.Model):
     is_active_member = models.BooleanField(default=True, verbose_name='Aktivan član')
     member_since = models.DateField(default=date.today, verbose_name='Član od')
     member_until = models.DateField(blank=True, null=True, verbose_name='Član do')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = PlayerQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'last_name']),
+            models.Index(fields=['category', 'is_active_member', 'member_since', 'member_until']),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -56,6 +104,13 @@ class Player(models.Model):
                 return "Neaktivan član"
     
     def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Brojače vodi projekcija dnevnika događaja; spremanje zastarjele
+            # instance ne smije prepisati ono što je u međuvremenu primijenjeno.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS.values()
+            ]
         if self.pk:  
             old_player = Player.objects.get(pk=self.pk)
             if not old_player.is_active_member and self.is_active_member:
@@ -85,6 +140,25 @@ class PlayerCategoryHistory(models.Model):
     def __str__(self):
         return f"{self.player} - {self.get_category_display()} ({self.changed_at.date()})"
 
+class PlayerEligibility(models.Model):
+    """A category the player may play in during the season starting on ``season_cutoff``.
+
+    Rows are derived by main.eligibility from the birth date and category
+    history and rebuilt whenever those change; never edit them directly.
+    """
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='eligibility')
+    season_cutoff = models.DateField()
+    category = models.CharField(max_length=3, choices=CATEGORIES)
+
+    class Meta:
+        constraints = [
+            # Također indeks za upit "igrači koji smiju igrati u kategoriji X u sezoni S".
+            models.UniqueConstraint(fields=['season_cutoff', 'category', 'player'], name='unique_player_eligibility'),
+        ]
+
+    def __str__(self):
+        return f"{self.player} - {self.get_category_display()} ({self.season_cutoff.year}/{self.season_cutoff.year + 1})"
+
 class MembershipHistory(models.Model):
     ACTION_CHOICES = [
         ('ACTIVATED', 'Aktiviran'),
@@ -110,7 +184,7 @@ class MembershipHistory(models.Model):
 class Match(models.Model):
     HOME_AWAY = [("H", "Suhača"), ("A", "Gostovanje")]
 
-    date = models.DateField()
+    date = models.DateField(db_index=True)
     home_or_away = models.CharField(max_length=1, choices=HOME_AWAY)
     opponent = models.CharField(max_length=100)
     home_score = models.PositiveIntegerField(default=0)
@@ -120,6 +194,12 @@ class Match(models.Model):
     bench_players = models.ManyToManyField(Player, related_name="bench", blank=True)
     captain = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, related_name="captain_matches")
     goalkeeper = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, related_name="goalkeeper_matches")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'date']),
+        ]
 
     def __str__(self):
         return f"{self.date} Smoljanci Sloboda vs {self.opponent} ({self.home_score}:{self.away_score})"
@@ -128,12 +208,6 @@ class MatchEvent(models.Model):
     match = models.ForeignKey(Match, on_delete=models.CASCADE)
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
 
-    def save(self, *args, **kwargs):
-        if not self.pk:
-            self.player.appearances += 1
-            self.player.save()
-        super().save(*args, **kwargs)
-
 class StaffMember(models.Model):
     ROLE_TYPES = [
         ("U", "Uprava"),
@@ -149,6 +223,7 @@ class StaffMember(models.Model):
     email = models.EmailField(blank=True, null=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} ({self.get_role_display()})"
@@ -158,6 +233,7 @@ class Meeting(models.Model):
     title = models.CharField(max_length=200)
     notes = models.TextField()
     attendees = models.ManyToManyField(StaffMember, related_name='meetings_attended')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"Sastanak: {self.title} ({self.date})"
@@ -173,6 +249,7 @@ class Equipment(models.Model):
     quantity = models.PositiveIntegerField()
     condition = models.CharField(max_length=50, default="Ispravno")
     purchase_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.get_type_display()} - {self.name} ({self.quantity})"
@@ -181,12 +258,6 @@ class Goal(models.Model):
     match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='goals')
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='goals_scored')
     minute = models.PositiveIntegerField()
-    
-    def save(self, *args, **kwargs):
-        if not self.pk:
-            self.player.goals += 1
-            self.player.save()
-        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Goal by {self.player} at {self.minute}'"
@@ -195,12 +266,6 @@ class Assist(models.Model):
     match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='assists')
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='assists_made')
     minute = models.PositiveIntegerField()
-    
-    def save(self, *args, **kwargs):
-        if not self.pk:
-            self.player.assists += 1
-            self.player.save()
-        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Assist by {self.player} at {self.minute}'"
@@ -210,15 +275,48 @@ class Card(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='cards_received')
     card_type = models.CharField(max_length=1, choices=CARD_TYPES)
     minute = models.PositiveIntegerField()
-    
-    def save(self, *args, **kwargs):
-        if not self.pk:
-            if self.card_type == "Y":
-                self.player.yellow_cards += 1
-            if self.card_type == "R":
-                self.player.red_cards += 1
-            self.player.save()
-        super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.get_card_type_display()} for {self.player} at {self.minute}'"
\ No newline at end of file
+        return f"{self.get_card_type_display()} for {self.player} at {self.minute}'"
+
+
+class MatchEventLog(models.Model):
+    """Append-only record of every change to a player's match statistics.
+
+    Corrections are new entries with a negative delta; rows are never updated
+    or deleted and outlive the matches and players they mention, so the
+    counters on Player can always be rebuilt from this table.
+    """
+    EVENT_TYPES = [
+        ('GOAL', 'Gol'),
+        ('ASSIST', 'Asistencija'),
+        ('YELLOW', 'Žuti karton'),
+        ('RED', 'Crveni karton'),
+        ('APPEARANCE', 'Nastup'),
+    ]
+
+    # Bez utakmice su samo ispravci brojača (reconcile_player_stats).
+    match = models.ForeignKey(Match, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+                              related_name='event_log')
+    player = models.ForeignKey(Player, on_delete=models.DO_NOTHING, db_constraint=False, related_name='event_log')
+    event_type = models.CharField(max_length=10, choices=EVENT_TYPES)
+    minute = models.PositiveIntegerField(null=True, blank=True)
+    delta = models.SmallIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['player', 'event_type']),
+            models.Index(fields=['match']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} {self.delta:+d} ({self.player_id}, {self.match_id})"
+
+class ProjectionCheckpoint(models.Model):
+    """Last MatchEventLog entry already applied to a projection."""
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
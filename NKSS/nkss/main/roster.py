@@ -0,0 +1,108 @@
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .eligibility import (
+    CATEGORY_AGE_LIMITS, CATEGORY_ORDER, age_on, eligible_categories, eligible_player_ids, refresh_eligibility,
+    season_cutoff,
+)
+from .models import CATEGORIES, MembershipHistory, Player, PlayerCategoryHistory
+
+
+def category_error(category, date_of_birth, previous_categories, today=None):
+    """Reason a player may not be moved to ``category``, or None if the move is allowed.
+
+    A player never returns to a younger category than one they already played
+    in, may not be older than the category's age limit at the start of the
+    season and may play at most PLAYING_UP categories above their age
+    (see main.eligibility).
+    """
+    if not category:
+        return None
+    current_index = CATEGORY_ORDER.index(category)
+    for prev_cat in previous_categories:
+        if CATEGORY_ORDER.index(prev_cat) > current_index:
+            return f"Igrač se ne može vratiti u mlađu kategoriju ({dict(CATEGORIES)[prev_cat]} > {dict(CATEGORIES)[category]})."
+    if date_of_birth and age_on(date_of_birth, season_cutoff(today)) > CATEGORY_AGE_LIMITS[category]:
+        return f"Igrač je prestar za kategoriju '{dict(CATEGORIES).get(category)}'."
+    lowest = max(previous_categories, key=CATEGORY_ORDER.index, default=None)
+    if date_of_birth and category not in eligible_categories(date_of_birth, lowest, season_cutoff(today)):
+        return f"Igrač je premlad za kategoriju '{dict(CATEGORIES).get(category)}'."
+    return None
+
+
+def promote_players(players, category, today=None):
+    """Move ``players`` to ``category`` with one UPDATE and one history INSERT.
+
+    Eligibility is one indexed lookup; the category history is only loaded
+    for the players that break the rules, to report why. They are left
+    unchanged. Returns ``(moved_players, errors)``.
+    """
+    with transaction.atomic():
+        players = list(
+            players.exclude(category=category)
+            .select_for_update()
+            .only('id', 'first_name', 'last_name', 'date_of_birth', 'category')
+        )
+        eligible = set(Player.objects.filter(
+            pk__in=[player.pk for player in players],
+        ).filter(pk__in=eligible_player_ids(category, today)).values_list('pk', flat=True))
+        moved = [player for player in players if player.pk in eligible]
+        rejected = [player for player in players if player.pk not in eligible]
+
+        history = defaultdict(set)
+        for player_id, prev_cat in PlayerCategoryHistory.objects.filter(
+            player__in=[player.pk for player in rejected]
+        ).values_list('player_id', 'category'):
+            history[player_id].add(prev_cat)
+        errors = []
+        for player in rejected:
+            previous = history[player.pk] | ({player.category} if player.category else set())
+            error = category_error(category, player.date_of_birth, previous, today)
+            errors.append(f"{player}: {error or 'Igrač ne ispunjava uvjete kategorije.'}")
+
+        Player.objects.filter(pk__in=[player.pk for player in moved]).update(
+            category=category, updated_at=timezone.now()
+        )
+        PlayerCategoryHistory.objects.bulk_create([
+            PlayerCategoryHistory(player=player, category=category) for player in moved
+        ])
+        # update() i bulk_create ne šalju signale, pa se prava nastupa osvježavaju ovdje.
+        refresh_eligibility([player.pk for player in moved])
+    return moved, errors
+
+
+def deactivate_players(players, until=None):
+    """Deactivate the active members among ``players`` in one transaction.
+
+    Writes the same DEACTIVATED history rows as ``Player.save`` does, but with
+    a single INSERT and a single UPDATE. ``member_until`` is set to ``until``,
+    or to today for players without an end date. Returns the deactivated players.
+    """
+    today = date.today()
+    with transaction.atomic():
+        players = list(
+            players.filter(is_active_member=True)
+            .select_for_update()
+            .only('id', 'first_name', 'last_name', 'member_since', 'member_until')
+        )
+        MembershipHistory.objects.bulk_create([
+            MembershipHistory(
+                player=player,
+                action='DEACTIVATED',
+                date_from=player.member_since,
+                date_until=until or player.member_until or today,
+                notes=f"Deaktiviran {today.strftime('%d.%m.%Y')}",
+            )
+            for player in players
+        ])
+        Player.objects.filter(pk__in=[player.pk for player in players]).update(
+            is_active_member=False,
+            member_until=Value(until) if until else Coalesce('member_until', Value(today)),
+            updated_at=timezone.now(),
+        )
+    return players
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Zajednički bazen dretvi za sinkrone sekcije; sekcija kojoj istekne vrijeme
+# i dalje zauzima svoju dretvu dok ne završi, pa je broj dretvi ograničen.
+SECTION_POOL = ThreadPoolExecutor(max_workers=settings.DASHBOARD_SECTION_WORKERS,
+                                  thread_name_prefix='dashboard-section')
+
+
+def in_worker(func, *args):
+    # Every pool thread keeps its own database connection between sections,
+    # like a request thread: it is only closed once CONN_MAX_AGE has passed
+    # or after an error.
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def section_failed(name, error):
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        logger.warning("Dashboard section %s timed out", name)
+    else:
+        logger.error("Dashboard section %s failed", name, exc_info=error)
+    return None
+
+
+async def arun_sections(sections, *args, timeout=None):
+    """Compute ``{name: func}`` with a timeout per section.
+
+    Coroutine sections are awaited directly, sync ones run in the section
+    pool. Returns ``{name: result}``; a section that raises or does not
+    finish within ``timeout`` seconds is ``None`` so the caller can render
+    without it.
+    """
+    timeout = settings.DASHBOARD_SECTION_TIMEOUT if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+
+    async def run(name, func):
+        if iscoroutinefunction(func):
+            pending = func(*args)
+        else:
+            pending = loop.run_in_executor(SECTION_POOL, partial(in_worker, func, *args))
+        try:
+            return await asyncio.wait_for(pending, timeout)
+        except Exception as error:
+            return section_failed(name, error)
+
+    values = await asyncio.gather(*(run(name, func) for name, func in sections.items()))
+    return dict(zip(sections, values))
@@ -0,0 +1,145 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .caching import touch_matches
+from .eligibility import refresh_eligibility
+from .events import log_entry, record_events
+from .models import Assist, Card, Goal, Match, Player, PlayerCategoryHistory
+
+CARD_EVENTS = {'Y': 'YELLOW', 'R': 'RED'}
+LINEUPS = (Match.starting_players.through, Match.bench_players.through)
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=Assist)
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=Assist)
+@receiver(post_delete, sender=Card)
+def invalidate_match_events(sender, instance, **kwargs):
+    # Events carry no timestamp of their own; touching the match keeps the
+    # conditional GET validators and the cached fragments of the match honest.
+    touch_matches(instance.match_id)
+
+
+@receiver(m2m_changed, sender=Match.starting_players.through)
+@receiver(m2m_changed, sender=Match.bench_players.through)
+def invalidate_match_lineup(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch_matches(instance.pk)
+    elif pk_set:
+        touch_matches(*pk_set)
+
+
+# Dnevnik događaja: svaki upis, izmjena i brisanje gola, asistencije, kartona
+# ili sastava postaje zapis s deltom, a brojači igrača su njegova projekcija.
+
+def event_type(instance):
+    if isinstance(instance, Card):
+        return CARD_EVENTS.get(instance.card_type)
+    return 'GOAL' if isinstance(instance, Goal) else 'ASSIST'
+
+
+def event_entry(instance, delta):
+    kind = event_type(instance)
+    return kind and log_entry(instance.match_id, instance.player_id, kind, instance.minute, delta)
+
+
+@receiver(pre_save, sender=Goal)
+@receiver(pre_save, sender=Assist)
+@receiver(pre_save, sender=Card)
+def remember_logged_event(sender, instance, raw=False, **kwargs):
+    instance._logged_event = None
+    if instance.pk and not raw:
+        instance._logged_event = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=Assist)
+@receiver(post_save, sender=Card)
+def log_saved_event(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_logged_event', None)
+    if previous and (previous.player_id, event_type(previous), previous.match_id) == (
+            instance.player_id, event_type(instance), instance.match_id):
+        return
+    entries = [event_entry(instance, 1)]
+    if previous:
+        entries.append(event_entry(previous, -1))
+    record_events([entry for entry in entries if entry])
+
+
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=Assist)
+@receiver(post_delete, sender=Card)
+def log_deleted_event(sender, instance, **kwargs):
+    entry = event_entry(instance, -1)
+    if entry:
+        record_events([entry])
+
+
+def lineup_pairs(sender, instance, reverse, pk_set=None):
+    """(match_id, player_id) rows of the lineup table touched by a change."""
+    rows = sender.objects.filter(**{'player_id' if reverse else 'match_id': instance.pk})
+    if pk_set is not None:
+        rows = rows.filter(**{'match_id__in' if reverse else 'player_id__in': pk_set})
+    return list(rows.values_list('match_id', 'player_id'))
+
+
+@receiver(m2m_changed, sender=Match.starting_players.through)
+@receiver(m2m_changed, sender=Match.bench_players.through)
+def log_lineup_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # pk_set of a removal may name players who were not in the lineup, so the
+    # rows actually removed or cleared are read before the change.
+    if action in ('pre_remove', 'pre_clear'):
+        instance._removed_lineup = lineup_pairs(sender, instance, reverse, pk_set)
+        return
+    if action in ('post_remove', 'post_clear'):
+        pairs, delta = instance.__dict__.pop('_removed_lineup', []), -1
+    elif action == 'post_add':
+        pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+        delta = 1
+    else:
+        return
+    record_events([log_entry(match_id, player_id, 'APPEARANCE', delta=delta) for match_id, player_id in pairs])
+
+
+@receiver(pre_delete, sender=Match)
+def log_deleted_lineup(sender, instance, **kwargs):
+    # Cascaded lineup rows are deleted without m2m_changed; goals, assists and
+    # cards are deleted one by one and reversed by log_deleted_event.
+    record_events([
+        log_entry(instance.pk, player_id, 'APPEARANCE', delta=-1)
+        for through in LINEUPS
+        for player_id in through.objects.filter(match_id=instance.pk).values_list('player_id', flat=True)
+    ])
+
+
+# Prava nastupa po kategorijama ovise o datumu rođenja i povijesti kategorija.
+
+@receiver(pre_save, sender=Player)
+def remember_eligibility_inputs(sender, instance, raw=False, **kwargs):
+    instance._eligibility_inputs = None
+    if instance.pk and not raw:
+        instance._eligibility_inputs = (
+            sender.objects.filter(pk=instance.pk).values_list('date_of_birth', 'category').first()
+        )
+
+
+@receiver(post_save, sender=Player)
+def refresh_player_eligibility(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_eligibility_inputs', None)
+    if created or previous != (instance.date_of_birth, instance.category):
+        refresh_eligibility([instance.pk])
+
+
+@receiver(post_save, sender=PlayerCategoryHistory)
+@receiver(post_delete, sender=PlayerCategoryHistory)
+def refresh_history_eligibility(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_eligibility([instance.player_id])
@@ -1,3 +1,726 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import events, views
+from .admin import GoalAdmin
+from .views import conditional_page
+from .eligibility import eligible_categories, eligible_player_ids, is_eligible, refresh_eligibility, season_cutoff
+from .events import batched_events, log_entry, project, rebuild, reconcile
+from .forms import MatchForm
+from .models import *
+from .roster import deactivate_players, promote_players
+from .sections import arun_sections
+
+
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class AdminChangelistQueryTests(TestCase):
+    """Changelists must not issue a query per listed row."""
+
+    changelists = ['player', 'match', 'goal', 'assist', 'card', 'matchevent']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@nkss.hr', 'lozinka')
+
+    def add_rows(self, count, category='SEN'):
+        start = Player.objects.count()
+        players = Player.objects.bulk_create([
+            Player(first_name=f"Igrač{start + i}", last_name="Horvat", date_of_birth=date(2000, 1, 1),
+                   position='MF', category=category)
+            for i in range(count)
+        ])
+        matches = Match.objects.bulk_create([
+            Match(date=date(2024, 1, 1) + timedelta(days=start + i), home_or_away='H',
+                  opponent=f"NK {start + i}", category=category)
+            for i in range(count)
+        ])
+        for model in (Goal, Assist):
+            model.objects.bulk_create([
+                model(match=match, player=player, minute=10) for match, player in zip(matches, players)
+            ])
+        Card.objects.bulk_create([
+            Card(match=match, player=player, minute=20, card_type='Y') for match, player in zip(matches, players)
+        ])
+        MatchEvent.objects.bulk_create([
+            MatchEvent(match=match, player=player) for match, player in zip(matches, players)
+        ])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def filtered_url(self, name, category='SEN'):
+        filters = {'player': 'category__exact', 'match': 'category__exact'}
+        return reverse(f'admin:main_{name}_changelist') + f"?{filters.get(name, 'match__category__exact')}={category}"
+
+    def get_filtered(self, name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.filtered_url(name))
+        self.assertEqual(response.status_code, 200)
+        table = f'"main_{name}"'
+        statements = [query['sql'] for query in queries.captured_queries if f'FROM {table}' in query['sql']]
+        return response, statements, [sql for sql in statements if 'COUNT(' in sql]
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.admin)
+        self.add_rows(20)
+        small = {}
+        for name in self.changelists:
+            small[name] = self.count_queries(reverse(f'admin:main_{name}_changelist'))
+        self.add_rows(500)
+        for name in self.changelists:
+            with self.subTest(changelist=name):
+                self.assertEqual(self.count_queries(reverse(f'admin:main_{name}_changelist')), small[name])
+
+    def test_filtered_changelist_skips_full_count(self):
+        # Filtrirani popis broji samo filtrirane retke: nijedan COUNT(*) bez
+        # WHERE, a stranica i dalje ima paginaciju po filtriranom broju.
+        self.client.force_login(self.admin)
+        self.add_rows(150)
+        self.add_rows(150, category='JUN')
+        for name in self.changelists:
+            with self.subTest(changelist=name):
+                response, statements, counts = self.get_filtered(name)
+                self.assertEqual(len(counts), 1)
+                self.assertIn('WHERE', counts[0])
+                cl = response.context['cl']
+                self.assertIsNone(cl.full_result_count)
+                self.assertEqual(cl.result_count, 150)
+                self.assertEqual(len(cl.result_list), 50)
+
+    def test_full_result_count_would_add_unfiltered_count(self):
+        # Kontrola: bez show_full_result_count=False isti zahtjev šalje i COUNT(*) cijele tablice.
+        self.client.force_login(self.admin)
+        self.add_rows(150)
+        self.add_rows(150, category='JUN')
+        with mock.patch.object(GoalAdmin, 'show_full_result_count', True):
+            response, statements, counts = self.get_filtered('goal')
+        self.assertEqual(len(counts), 2)
+        self.assertEqual(sum('WHERE' not in sql for sql in counts), 1)
+        self.assertEqual(response.context['cl'].full_result_count, 300)
+
+    def test_events_load_match_and_player_in_page_query(self):
+        self.client.force_login(self.admin)
+        self.add_rows(60)
+        for name in ['goal', 'assist', 'card', 'matchevent']:
+            with self.subTest(changelist=name):
+                response, statements, counts = self.get_filtered(name)
+                page = [sql for sql in statements if sql.startswith(f'SELECT "main_{name}".')]
+                self.assertEqual(len(page), 1)
+                self.assertIn('JOIN "main_match"', page[0])
+                self.assertIn('JOIN "main_player"', page[0])
+
+
+class DashboardSectionTests(SimpleTestCase):
+    """A slow or failing section is left out instead of breaking the page."""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def sections(self):
+        async def club(value):
+            return value * 2
+
+        def slow(value):
+            self.release.wait(5)
+            return value
+
+        def broken(value):
+            raise ValueError(value)
+
+        return {'fast': lambda value: value + 1, 'club': club, 'slow': slow, 'broken': broken}
+
+    def test_async_sections(self):
+        with self.assertLogs('main.sections', 'WARNING'):
+            results = async_to_sync(arun_sections)(self.sections(), 10, timeout=0.2)
+        self.assertEqual(results, {'fast': 11, 'club': 20, 'slow': None, 'broken': None})
+
+
+@override_settings(STORAGES=TEST_STORAGES, DASHBOARD_SECTION_TIMEOUT=0.2)
+class DashboardEndpointTests(TransactionTestCase):
+    """The page is a shell; series are computed only by their endpoint."""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def test_page_does_not_compute_series(self):
+        broken = {name: mock.Mock(side_effect=AssertionError(name)) for name in views.DASHBOARD_SERIES}
+        with mock.patch.dict(views.DASHBOARD_SERIES, broken):
+            response = self.client.get(reverse('main:stats_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['club_stats']['total_matches'], 0)
+        for series in broken.values():
+            series.assert_not_called()
+
+    def test_slow_club_summary_is_left_out(self):
+        async def slow_summary(filters):
+            await asyncio.sleep(5)
+
+        with mock.patch.object(views, 'aclub_summary', slow_summary):
+            with self.assertLogs('main.sections', 'WARNING'):
+                response = self.client.get(reverse('main:stats_dashboard'))
+        self.assertIsNone(response.context['club_stats'])
+        self.assertContains(response, "Statistika kluba trenutno nije dostupna")
+
+    def test_series_endpoint(self):
+        response = self.client.get(reverse('main:stats_dashboard_data', args=['goals']))
+        self.assertEqual(response.json()['data'], [])
+        self.assertEqual(self.client.get(reverse('main:stats_dashboard_data', args=['nepostojeca'])).status_code, 404)
+
+    def test_slow_series_is_unavailable(self):
+        with mock.patch.dict(views.DASHBOARD_SERIES, {'goals': lambda filters: self.release.wait(5)}):
+            with self.assertLogs('main.sections', 'WARNING'):
+                response = self.client.get(reverse('main:stats_dashboard_data', args=['goals']))
+        self.assertEqual(response.status_code, 503)
+
+
+class EventLogTests(TransactionTestCase):
+    """Event writes only append to the log; counters are its projection."""
+
+    def setUp(self):
+        self.player = Player.objects.create(first_name="Luka", last_name="Horvat", date_of_birth=date(2000, 1, 1),
+                                            position='FW', category='SEN')
+        self.match = Match.objects.create(date=date(2024, 3, 1), home_or_away='H', opponent="NK Tenja",
+                                          category='SEN')
+
+    def counters(self):
+        self.player.refresh_from_db()
+        return {field: getattr(self.player, field) for field in COUNTER_FIELDS.values()}
+
+    def test_write_appends_and_projects_on_commit(self):
+        with mock.patch('main.events.project', wraps=events.project) as projected:
+            with transaction.atomic():
+                for minute in (10, 20):
+                    Goal.objects.create(match=self.match, player=self.player, minute=minute)
+                Card.objects.create(match=self.match, player=self.player, minute=30, card_type='Y')
+                self.assertEqual(MatchEventLog.objects.filter(player=self.player).count(), 3)
+                self.assertEqual(self.counters()['goals'], 0)
+        self.assertEqual(projected.call_count, 1)
+        self.assertEqual(self.counters(), {'goals': 2, 'assists': 0, 'yellow_cards': 1, 'red_cards': 0,
+                                           'appearances': 0})
+
+    def test_changes_and_deletions_are_reversed(self):
+        card = Card.objects.create(match=self.match, player=self.player, minute=30, card_type='Y')
+        self.match.starting_players.add(self.player)
+        card.card_type = 'R'
+        card.save()
+        self.match.starting_players.remove(self.player)
+        self.assertEqual(self.counters(), {'goals': 0, 'assists': 0, 'yellow_cards': 0, 'red_cards': 1,
+                                           'appearances': 0})
+        card.delete()
+        self.assertEqual(self.counters()['red_cards'], 0)
+        self.assertEqual(MatchEventLog.objects.filter(player=self.player).count(), 6)
+
+    def test_batched_writes_are_logged_once(self):
+        for minute in (10, 20, 30):
+            Goal.objects.create(match=self.match, player=self.player, minute=minute)
+        with CaptureQueriesContext(connection) as queries:
+            with batched_events():
+                self.match.goals.all().delete()
+                Goal.objects.create(match=self.match, player=self.player, minute=40)
+                self.match.starting_players.add(self.player)
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "main_matcheventlog"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "main_match" SET')]), 1)
+        self.assertEqual(MatchEventLog.objects.count(), 8)
+        self.assertEqual((self.counters()['goals'], self.counters()['appearances']), (1, 1))
+
+    def test_rolled_back_write_is_not_projected(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                Goal.objects.create(match=self.match, player=self.player, minute=10)
+                raise ValueError
+        Assist.objects.create(match=self.match, player=self.player, minute=20)
+        self.assertEqual((self.counters()['goals'], self.counters()['assists']), (0, 1))
+
+    def test_project_applies_only_new_entries(self):
+        MatchEventLog.objects.bulk_create([
+            log_entry(self.match.pk, self.player.pk, 'GOAL', 10),
+            log_entry(self.match.pk, self.player.pk, 'ASSIST', 20),
+            log_entry(self.match.pk, self.player.pk, 'GOAL', 30, delta=-1),
+            log_entry(self.match.pk, self.player.pk, 'GOAL', 40),
+        ])
+        self.assertEqual(project(), 1)
+        self.assertEqual((self.counters()['goals'], self.counters()['assists']), (1, 1))
+        self.assertEqual(ProjectionCheckpoint.objects.get().last_event_id, MatchEventLog.objects.latest('pk').pk)
+        self.assertEqual(project(), 0)
+        self.assertEqual(self.counters()['goals'], 1)
+
+    def test_rebuild_recomputes_from_the_log(self):
+        Goal.objects.create(match=self.match, player=self.player, minute=10)
+        Assist.objects.create(match=self.match, player=self.player, minute=10)
+        Player.objects.filter(pk=self.player.pk).update(goals=7, assists=0, red_cards=3)
+        MatchEventLog.objects.create(player=self.player, event_type='YELLOW', delta=-2)
+        self.assertEqual(rebuild([self.player.pk]), 1)
+        self.assertEqual(self.counters(), {'goals': 1, 'assists': 1, 'yellow_cards': 0, 'red_cards': 0,
+                                           'appearances': 0})
+        self.assertFalse(MatchEventLog.objects.filter(pk__gt=ProjectionCheckpoint.objects.get().last_event_id).exists())
+
+
+class ReconcileTests(TransactionTestCase):
+    """Counters drifted from the event tables are found and repaired."""
+
+    def setUp(self):
+        self.player = Player.objects.create(first_name="Luka", last_name="Horvat", date_of_birth=date(2000, 1, 1),
+                                            position='FW', category='SEN')
+        self.match = Match.objects.create(date=date(2024, 3, 1), home_or_away='H', opponent="NK Tenja",
+                                          category='SEN')
+        Goal.objects.create(match=self.match, player=self.player, minute=10)
+        # Bez signala: ni brojač ni dnevnik ne znaju za drugi gol, a asistencije su izmišljene.
+        Goal.objects.bulk_create([Goal(match=self.match, player=self.player, minute=20)])
+        Player.objects.filter(pk=self.player.pk).update(assists=4)
+
+    def reconcile_command(self, *args):
+        out = StringIO()
+        call_command('reconcile_player_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def test_drift_is_reported(self):
+        drifted = reconcile(commit=False)
+        self.assertEqual([(player.pk, changes) for player, changes in drifted],
+                         [(self.player.pk, {'goals': (1, 2), 'assists': (4, 0)})])
+
+    def test_dry_run_writes_nothing(self):
+        log_size = MatchEventLog.objects.count()
+        output = self.reconcile_command('--dry-run')
+        self.assertIn("goals 1 → 2", output)
+        self.assertIn("pronađeno odstupanja: 1", output)
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.goals, self.player.assists), (1, 4))
+        self.assertEqual(MatchEventLog.objects.count(), log_size)
+
+    def test_repair_is_kept_by_a_full_replay(self):
+        self.assertIn("ispravljeno odstupanja: 1", self.reconcile_command())
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.goals, self.player.assists), (2, 0))
+        correction = MatchEventLog.objects.get(match=None)
+        self.assertEqual((correction.event_type, correction.delta), ('GOAL', 1))
+        self.assertEqual(reconcile(), [])
+        rebuild()
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.goals, self.player.assists), (2, 0))
+
+    def test_since_limits_the_players(self):
+        self.assertIn("Provjereno igrača: 0", self.reconcile_command('--since', '2999-01-01'))
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.assists, 4)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class MatchDetailCacheTests(TestCase):
+    """Lineup and events are read only when their cached fragments miss."""
+
+    def setUp(self):
+        cache.clear()
+        self.player = Player.objects.create(first_name="Luka", last_name="Horvat", date_of_birth=date(2000, 1, 1),
+                                            position='FW', category='SEN')
+        self.match = Match.objects.create(date=date(2024, 3, 1), home_or_away='H', opponent="NK Tenja",
+                                          category='SEN')
+        self.match.starting_players.add(self.player)
+        self.url = reverse('main:match_detail', args=[self.match.pk])
+
+    def fragment_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith(('SELECT "main_goal".', 'SELECT "main_assist".', 'SELECT "main_card".'))
+                or query['sql'].startswith('SELECT "main_player"."id"') and 'JOIN "main_match_' in query['sql']]
+
+    def test_cached_fragments_skip_their_queries(self):
+        self.assertEqual(len(self.fragment_queries()), 5)
+        self.assertEqual(self.fragment_queries(), [])
+        # Novi događaj pomiče updated_at utakmice, pa fragmenti dobivaju novi ključ.
+        Goal.objects.create(match=self.match, player=self.player, minute=10)
+        self.assertEqual(len(self.fragment_queries()), 5)
+        self.assertEqual(self.fragment_queries(), [])
+
+
+class EligibilityTests(TestCase):
+    """Read paths answer from the season table, or from the rule without writing."""
+
+    def setUp(self):
+        # 16 godina na dan 1. 7. 2024.: smije igrati za juniore, seniore i veterane.
+        self.junior = Player.objects.create(first_name="Ivan", last_name="Babić", date_of_birth=date(2007, 9, 1),
+                                            position='MF', category='JUN')
+        self.day = date(2024, 9, 1)
+
+    def test_missing_season_uses_the_rule_without_writing(self):
+        self.assertFalse(PlayerEligibility.objects.exists())
+        self.assertEqual(list(eligible_player_ids('JUN', self.day)), [self.junior.pk])
+        self.assertEqual(list(eligible_player_ids('SP', self.day)), [])
+        self.assertTrue(is_eligible(self.junior.pk, 'SEN', self.day))
+        self.assertFalse(is_eligible(self.junior.pk, 'SP', self.day))
+        self.assertFalse(PlayerEligibility.objects.exists())
+
+    def test_rule_bounds(self):
+        cutoff = date(2024, 7, 1)
+        cases = [
+            (date(2017, 1, 1), 'U9', ['U9', 'U11']),
+            (date(2007, 9, 1), 'JUN', ['JUN', 'SEN']),
+            (date(2007, 9, 1), 'SEN', ['SEN']),
+            (date(1994, 1, 1), 'SEN', ['SEN']),
+            (date(1984, 1, 1), 'SEN', ['SEN', 'VET']),
+            (date(1964, 1, 1), 'SEN', ['VET']),
+        ]
+        for date_of_birth, lowest, categories in cases:
+            with self.subTest(date_of_birth=date_of_birth, lowest=lowest):
+                self.assertEqual(eligible_categories(date_of_birth, lowest, cutoff), categories)
+
+    def test_child_is_not_eligible_for_adult_categories(self):
+        child = Player.objects.create(first_name="Marko", last_name="Anić", date_of_birth=date(2017, 1, 1),
+                                      position='MF', category='U9')
+        for use_table in (False, True):
+            if use_table:
+                refresh_eligibility(cutoffs=[season_cutoff(self.day)])
+            for category in ('SEN', 'VET'):
+                with self.subTest(category=category, table=use_table):
+                    eligible = Player.objects.filter(pk__in=eligible_player_ids(category, self.day))
+                    self.assertFalse(eligible.filter(pk=child.pk).exists())
+                    self.assertFalse(is_eligible(child.pk, category, self.day))
+            self.assertTrue(is_eligible(child.pk, 'U11', self.day))
+
+    def test_only_a_full_refresh_adds_a_season(self):
+        refresh_eligibility([self.junior.pk])
+        self.assertFalse(PlayerEligibility.objects.exists())
+        refresh_eligibility()
+        self.assertEqual(set(PlayerEligibility.objects.values_list('season_cutoff', flat=True)), {season_cutoff()})
+        self.assertTrue(is_eligible(self.junior.pk, 'SEN'))
+        # Postojeća sezona se osvježava i signalom, za jednog igrača.
+        senior = Player.objects.create(first_name="Ante", last_name="Horvat", date_of_birth=date(1990, 1, 1),
+                                       position='DF', category='SEN')
+        self.assertTrue(PlayerEligibility.objects.filter(player=senior, season_cutoff=season_cutoff()).exists())
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class MatchPromotionTests(TestCase):
+    """A match stays editable after players in its lineup are promoted."""
+
+    def setUp(self):
+        born = date(season_cutoff().year - 17, 1, 1)
+        self.squad = [
+            Player.objects.create(first_name="Igrač", last_name=f"Junior{index:02d}", date_of_birth=born,
+                                  position='GK' if index == 0 else 'MF', category='JUN')
+            for index in range(13)
+        ]
+        refresh_eligibility()
+        self.match = Match.objects.create(date=timezone.localdate(), home_or_away='H', opponent="NK Tenja",
+                                          category='JUN', captain=self.squad[1], goalkeeper=self.squad[0])
+        self.match.starting_players.set(self.squad[:11])
+        self.match.bench_players.set(self.squad[11:])
+
+    def edit(self, **changes):
+        data = {
+            'date': self.match.date.isoformat(), 'home_or_away': 'H', 'opponent': "NK Tenja",
+            'home_score': 0, 'away_score': 0, 'category': 'JUN',
+            'starting_players': [player.pk for player in self.squad[:11]],
+            'bench_players': [player.pk for player in self.squad[11:]],
+            'captain': self.squad[1].pk, 'goalkeeper': self.squad[0].pk,
+            **changes,
+        }
+        for prefix in ('goals', 'assists', 'cards'):
+            data.update({f'{prefix}-TOTAL_FORMS': 0, f'{prefix}-INITIAL_FORMS': 0})
+        return self.client.post(reverse('main:match_update', args=[self.match.pk]), data)
+
+    def test_edit_after_promotion(self):
+        moved, errors = promote_players(Player.objects.filter(pk__in=[player.pk for player in self.squad[:3]]), 'SEN')
+        self.assertEqual((len(moved), errors), (3, []))
+        day = self.match.date
+        self.assertFalse(Player.objects.eligible_on(day, 'JUN').filter(pk=self.squad[0].pk).exists())
+
+        response = self.edit(opponent="NK Osijek")
+        self.assertRedirects(response, reverse('main:match_detail', args=[self.match.pk]),
+                             fetch_redirect_response=False)
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.opponent, "NK Osijek")
+        self.assertEqual(set(self.match.starting_players.all()), set(self.squad[:11]))
+
+    def test_under_age_player_is_not_offered(self):
+        child = Player.objects.create(first_name="Marko", last_name="Anić", date_of_birth=date(2017, 1, 1),
+                                      position='GK', category='U9')
+        for category in ('SEN', 'VET'):
+            with self.subTest(category=category):
+                form = MatchForm(initial={'category': category})
+                self.assertNotIn(child, form.fields['starting_players'].queryset)
+                self.assertNotIn(child, form.fields['goalkeeper'].queryset)
+                # Igrač smije igrati i kategoriju više, ali se nudi samo u onoj u koju je upisan.
+                self.assertNotIn(self.squad[5], form.fields['starting_players'].queryset)
+
+    def test_ineligible_player_cannot_join_the_lineup(self):
+        outsider = Player.objects.create(first_name="Ante", last_name="Gost", date_of_birth=date(1990, 1, 1),
+                                         position='MF', category='SEN')
+        response = self.edit(bench_players=[self.squad[11].pk, outsider.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('bench_players', response.context['form'].errors)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class RosterCommandTests(TestCase):
+    """Bulk deactivation and promotion, directly and through the management commands."""
+
+    def setUp(self):
+        self.today = date.today()
+        self.lapsed, self.open_ended, self.retired = [
+            Player.objects.create(first_name="Ivan", last_name=last_name, date_of_birth=date(1990, 1, 1),
+                                  position='DF', category='SEN', member_since=date(2018, 1, 1),
+                                  member_until=member_until, is_active_member=active)
+            for last_name, member_until, active in [
+                ("Kovač", self.today - timedelta(days=30), True),
+                ("Novak", None, True),
+                ("Jurić", date(2019, 1, 1), False),
+            ]
+        ]
+
+    def born(self, age):
+        cutoff = season_cutoff()
+        return cutoff.replace(year=cutoff.year - age)
+
+    def test_deactivate_players_writes_history_in_bulk(self):
+        with self.assertNumQueries(5):  # SAVEPOINT, SELECT, INSERT povijesti, UPDATE, RELEASE
+            deactivated = deactivate_players(Player.objects.all())
+        self.assertEqual({player.pk for player in deactivated}, {self.lapsed.pk, self.open_ended.pk})
+        history = MembershipHistory.objects.filter(action='DEACTIVATED')
+        self.assertEqual(dict(history.values_list('player_id', 'date_until')), {
+            self.lapsed.pk: self.lapsed.member_until,
+            self.open_ended.pk: self.today,
+        })
+        self.assertEqual(set(history.values_list('date_from', flat=True)), {date(2018, 1, 1)})
+        self.assertFalse(Player.objects.filter(is_active_member=True).exists())
+
+    def test_deactivate_players_keeps_existing_end_date(self):
+        deactivate_players(Player.objects.all())
+        self.assertEqual(dict(Player.objects.values_list('pk', 'member_until')), {
+            self.lapsed.pk: self.lapsed.member_until,
+            self.open_ended.pk: self.today,
+            self.retired.pk: date(2019, 1, 1),
+        })
+
+    def test_deactivate_players_until_overrides_end_date(self):
+        until = self.today + timedelta(days=10)
+        deactivate_players(Player.objects.all(), until=until)
+        self.assertEqual(set(Player.objects.filter(pk__in=[self.lapsed.pk, self.open_ended.pk])
+                             .values_list('member_until', flat=True)), {until})
+        self.assertEqual(Player.objects.get(pk=self.retired.pk).member_until, date(2019, 1, 1))
+
+    def test_deactivate_members_command(self):
+        out = StringIO()
+        call_command('deactivate_members', '--lapsed', stdout=out)
+        self.assertIn("Deaktivirano igrača: 1.", out.getvalue())
+        self.assertEqual(list(Player.objects.filter(is_active_member=True)), [self.open_ended])
+
+        out = StringIO()
+        call_command('deactivate_members', '--ids', str(self.open_ended.pk), '--until', '2030-06-30', stdout=out)
+        self.assertIn("Deaktivirano igrača: 1.", out.getvalue())
+        self.assertEqual(Player.objects.get(pk=self.open_ended.pk).member_until, date(2030, 6, 30))
+
+    def test_deactivate_members_command_validates_arguments(self):
+        for args in [(), ('--category', 'XYZ'), ('--ids', 'abc'), ('--lapsed', '--until', '30.06.2030')]:
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                call_command('deactivate_members', *args, stdout=StringIO())
+        self.assertFalse(MembershipHistory.objects.exists())
+
+    def test_promote_category_command(self):
+        junior, pioneer = [
+            Player.objects.create(first_name="Marko", last_name=last_name, date_of_birth=self.born(age),
+                                  position='MF', category='JUN')
+            for last_name, age in [("Perić", 18), ("Marić", 14)]
+        ]
+        out, err = StringIO(), StringIO()
+        call_command('promote_category', 'JUN', 'SEN', stdout=out, stderr=err)
+        self.assertIn("Premješteno igrača: 1, preskočeno: 1.", out.getvalue())
+        self.assertIn(f"{pioneer}: Igrač je premlad za kategoriju 'Seniori'.", err.getvalue())
+        self.assertEqual(Player.objects.get(pk=junior.pk).category, 'SEN')
+        self.assertEqual(Player.objects.get(pk=pioneer.pk).category, 'JUN')
+        self.assertEqual(list(PlayerCategoryHistory.objects.values_list('player_id', 'category')),
+                         [(junior.pk, 'SEN')])
+
+    def test_promote_category_command_filters(self):
+        Player.objects.create(first_name="Marko", last_name="Perić", date_of_birth=self.born(18),
+                              position='MF', category='JUN', is_active_member=False)
+        out = StringIO()
+        call_command('promote_category', 'JUN', 'SEN', '--active-only', stdout=out)
+        self.assertIn("Premješteno igrača: 0, preskočeno: 0.", out.getvalue())
+        call_command('promote_category', 'JUN', 'SEN', '--born-before', self.born(19).isoformat(), stdout=out)
+        self.assertIn("Premješteno igrača: 0, preskočeno: 0.", out.getvalue())
+        self.assertFalse(Player.objects.filter(category='SEN', last_name="Perić").exists())
+
+    def test_promote_category_command_validates_arguments(self):
+        for args in [('SEN', 'SEN'), ('JUN', 'XYZ'), ('JUN',), ('JUN', 'SEN', '--born-before', '1.1.2000')]:
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                call_command('promote_category', *args, stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(PlayerCategoryHistory.objects.exists())
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class AddEventsTests(TransactionTestCase):
+    """A batch of events is recorded whole or not at all."""
+
+    def setUp(self):
+        self.scorer, self.assistant = [
+            Player.objects.create(first_name="Luka", last_name=last_name, date_of_birth=date(1995, 1, 1),
+                                  position='FW', category='SEN', member_since=date(2020, 1, 1))
+            for last_name in ("Horvat", "Babić")
+        ]
+        self.match = Match.objects.create(date=date(2024, 3, 1), home_or_away='H', opponent="NK Tenja",
+                                          category='SEN')
+        self.match.starting_players.add(self.scorer, self.assistant)
+        self.url = reverse('main:add_events', args=[self.match.pk])
+
+    def post(self, body):
+        return self.client.post(self.url, body if isinstance(body, str) else json.dumps(body),
+                                content_type='application/json')
+
+    def written(self):
+        return (Goal.objects.count(), Assist.objects.count(), Card.objects.count(),
+                MatchEventLog.objects.exclude(event_type='APPEARANCE').count())
+
+    def test_valid_batch(self):
+        updated_at = Match.objects.get().updated_at
+        response = self.post({'events': [
+            {'type': 'goal', 'player': self.scorer.pk, 'minute': 12},
+            {'type': 'assist', 'player': self.assistant.pk, 'minute': 12},
+            {'type': 'goal', 'player': self.scorer.pk, 'minute': 70},
+            {'type': 'card', 'player': self.assistant.pk, 'minute': 80, 'card_type': 'Y'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Horvat")
+        self.assertEqual(self.written(), (2, 1, 1, 4))
+        self.scorer.refresh_from_db()
+        self.assistant.refresh_from_db()
+        self.assertEqual((self.scorer.goals, self.assistant.assists, self.assistant.yellow_cards), (2, 1, 1))
+        self.assertGreater(Match.objects.get().updated_at, updated_at)
+
+    def test_one_invalid_event_rejects_the_batch(self):
+        outsider = Player.objects.create(first_name="Ante", last_name="Gost", date_of_birth=date(1995, 1, 1),
+                                         position='FW', category='SEN', member_since=date(2020, 1, 1))
+        cases = {
+            'not in lineup': {'type': 'goal', 'player': outsider.pk, 'minute': 30},
+            'minute': {'type': 'goal', 'player': self.scorer.pk, 'minute': 120},
+            'card type': {'type': 'card', 'player': self.scorer.pk, 'minute': 30},
+        }
+        for case, event in cases.items():
+            with self.subTest(case=case):
+                response = self.post({'events': [{'type': 'goal', 'player': self.scorer.pk, 'minute': 10}, event]})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()['errors']), ['1'])
+                self.assertEqual(self.written(), (0, 0, 0, 0))
+        self.scorer.refresh_from_db()
+        self.assertEqual(self.scorer.goals, 0)
+
+    def test_under_age_player_in_the_lineup_is_rejected(self):
+        # Sastav upisan mimo obrasca: pravo nastupa provjerava i sam unos događaja.
+        child = Player.objects.create(first_name="Marko", last_name="Anić", date_of_birth=date(2017, 1, 1),
+                                      position='FW', category='U9', member_since=date(2020, 1, 1))
+        self.match.bench_players.add(child)
+        response = self.post({'events': [{'type': 'goal', 'player': child.pk, 'minute': 10}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('player', response.json()['errors']['0'])
+        self.assertEqual(self.written(), (0, 0, 0, 0))
+
+    def test_malformed_body(self):
+        for body in ('{"events": [', '[]', '{"events": []}', '{"events": {"type": "goal"}}'):
+            with self.subTest(body=body):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('events', response.json()['errors'])
+        self.assertEqual(self.written(), (0, 0, 0, 0))
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class ConditionalPageTests(TestCase):
+    """Unchanged pages are answered with 304; a write changes the ETag."""
+
+    def setUp(self):
+        self.match = Match.objects.create(date=date(2024, 3, 1), home_or_away='H', opponent="NK Tenja",
+                                          category='SEN')
+
+    def assert_conditional(self, get):
+        response = get()
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Match.objects.create(date=date(2024, 4, 1), home_or_away='A', opponent="NK Pula", category='SEN')
+        response = get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        etag = response.headers['ETag']
+        # Brisanje ne pomiče najnoviji updated_at, ali mijenja broj redaka.
+        Match.objects.filter(opponent="NK Pula").delete()
+        self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_async_view(self):
+        url = reverse('main:match_list')
+        self.assert_conditional(lambda **headers: self.client.get(url, **headers))
+
+    def test_sync_view(self):
+        view = conditional_page(lambda: [Match.objects.all()])(lambda request: HttpResponse("utakmice"))
+        factory = RequestFactory()
+        self.assert_conditional(lambda **headers: view(factory.get('/utakmice/', **headers)))
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class AsyncPageTests(TestCase):
+    """The async views, requested through the async client."""
+
+    def setUp(self):
+        cache.clear()
+        self.player = Player.objects.create(first_name="Luka", last_name="Horvat", date_of_birth=date(1995, 1, 1),
+                                            position='FW', category='SEN', member_since=date(2020, 1, 1))
+        self.match = Match.objects.create(date=date(2024, 3, 1), home_or_away='H', opponent="NK Tenja",
+                                          category='SEN', home_score=2, away_score=1)
+        self.match.starting_players.add(self.player)
+        Goal.objects.create(match=self.match, player=self.player, minute=10)
+        refresh_eligibility(cutoffs=[season_cutoff(self.match.date)])
+
+    def get(self, url, queries):
+        # Pogledi se izvršavaju u event loopu, a ORM iz sync_to_async se vraća
+        # u ovu nit, pa assertNumQueries broji njihove upite.
+        with self.assertNumQueries(queries):
+            response = async_to_sync(self.async_client.get)(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_player_detail(self):
+        response = self.get(reverse('main:player_detail', args=[self.player.pk]), 5)
+        self.assertEqual(response.context['player'], self.player)
+
+    def test_match_list(self):
+        response = self.get(reverse('main:match_list'), 2)
+        self.assertEqual(response.context['matches'], [self.match])
+
+    def test_match_detail(self):
+        response = self.get(reverse('main:match_detail', args=[self.match.pk]), 10)
+        self.assertEqual(response.context['match'], self.match)
+        self.assertContains(response, "Horvat")
+
+    def test_stats_dashboard(self):
+        response = self.get(reverse('main:stats_dashboard'), 4)
+        self.assertEqual(response.context['club_stats']['wins'], 1)
@@ -12,6 +12,7 @@ urlpatterns = [
     path("players/<int:pk>/edit/", views.player_update, name="player_update"),
     path("players/<int:pk>/delete/", views.player_delete, name="player_delete"),
     path("players/stats/", views.stats_dashboard, name='stats_dashboard'),
+    path("players/stats/data/<str:series>/", views.stats_dashboard_data, name='stats_dashboard_data'),
 
     # Match urls
     path("matches/", views.match_list, name="match_list"),
@@ -22,6 +23,7 @@ urlpatterns = [
     path('matches/<int:match_id>/add_goal/', views.add_goal, name='add_goal'),
     path('matches/<int:match_id>/add_assist/', views.add_assist, name='add_assist'),
     path('matches/<int:match_id>/add_card/', views.add_card, name='add_card'),
+    path('matches/<int:match_id>/events/', views.add_events, name='add_events'),
     
     # Staff urls
     path('staff/', views.staffmember_list, name='staffmember-list'),
@@ -1,13 +1,94 @@
+import hashlib
+import json
 from datetime import timedelta, date
-from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q, Sum, Count, F
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.db import transaction
+from django.db.models import Q, Sum, Count, F, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from .caching import match_cache_version, touch_matches
+from .events import batched_events, log_entry, record_events
+from .sections import arun_sections
 from .models import *
 from .forms import *
 
 def index(request):
     return render(request, 'main/index.html')
 
-def player_list(request):
+FRESHNESS = {'latest': Max('updated_at'), 'total': Count('pk', distinct=True)}
+
+def freshness_validators(request, rows):
+    # Today's date is part of the ETag because the dashboard's period filters
+    # (last month/year) count back from today: every ETag changes at midnight
+    # and the first request of the day is rendered in full.
+    last_modified = None
+    parts = [request.get_full_path(), date.today().isoformat()]
+    for row in rows:
+        parts.append(f"{row['total']}:{row['latest'].isoformat() if row['latest'] else ''}")
+        if row['latest'] and (last_modified is None or row['latest'] > last_modified):
+            last_modified = row['latest']
+    return last_modified, hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+def page_freshness(request, querysets):
+    """Last-Modified and ETag of a page built from the given querysets.
+
+    Each queryset costs one MAX/COUNT query over the indexed ``updated_at``
+    column; the count catches deletions that do not move the maximum. The
+    result is memoized on the request so both validators share the queries.
+    """
+    if not hasattr(request, '_page_freshness'):
+        rows = [queryset.aggregate(**FRESHNESS) for queryset in querysets]
+        request._page_freshness = freshness_validators(request, rows)
+    return request._page_freshness
+
+async def apage_freshness(request, querysets):
+    rows = [await queryset.aaggregate(**FRESHNESS) for queryset in querysets]
+    return freshness_validators(request, rows)
+
+def conditional_page(querysets_func):
+    """Answer GETs with 304 Not Modified when the page's data is unchanged.
+
+    Django's condition() calls its validator functions synchronously, so
+    async views get their own wrapper that awaits the freshness queries.
+    """
+    def last_modified(request, *args, **kwargs):
+        return page_freshness(request, querysets_func(*args, **kwargs))[0]
+
+    def etag(request, *args, **kwargs):
+        return page_freshness(request, querysets_func(*args, **kwargs))[1]
+
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            return condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            modified, tag = await apage_freshness(request, querysets_func(*args, **kwargs))
+            tag = quote_etag(tag)
+            timestamp = int(modified.timestamp()) if modified else None
+            response = get_conditional_response(request, etag=tag, last_modified=timestamp)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if timestamp and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(timestamp)
+                response.headers.setdefault('ETag', tag)
+            return response
+        return inner
+
+    return decorator
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+def filter_players(request):
     players = Player.objects.all().order_by('category', 'last_name')
 
     filters = ['category', 'first_name', 'last_name', 'date_of_birth', 'position', 'status']
@@ -27,35 +108,30 @@ def player_list(request):
         players = players.filter(is_active_member=True)
     elif filter_values['status'] == 'inactive':
         players = players.filter(is_active_member=False)
+    return players, filter_values
 
+async def player_list(request):
+    players, filter_values = filter_players(request)
     return render(request, 'main/players/player_list.html', {
-        'players': players,
+        'players': await alist(players),
         'filter_values': filter_values,
         'categories': CATEGORIES,
         'positions': POSITIONS,
     })
 
-def player_detail(request, pk):
-    player = get_object_or_404(Player, pk=pk)
-    history = player.category_history.order_by('-changed_at')
-    
-    player_matches = Match.objects.filter(
-        Q(starting_players=player) | Q(bench_players=player)
-    ).distinct()
-    real_appearances = player_matches.count()
-    real_goals = Goal.objects.filter(player=player).count()
-    real_assists = Assist.objects.filter(player=player).count()
-    real_yellow_cards = Card.objects.filter(player=player, card_type='Y').count()
-    real_red_cards = Card.objects.filter(player=player, card_type='R').count()
-    
+@conditional_page(lambda pk: [
+    Player.objects.filter(pk=pk),
+    Match.objects.filter(Q(starting_players=pk) | Q(bench_players=pk)),
+])
+async def player_detail(request, pk):
+    player = await aget_object_or_404(Player, pk=pk)
+    # Brojači na igraču su projekcija dnevnika događaja (main.events).
+    history = await alist(player.category_history.order_by('-changed_at'))
+    membership_history = await alist(player.membership_history.all())
     return render(request, 'main/players/player_detail.html', {
         'player': player,
         'category_history': history,
-        'real_appearances': real_appearances,
-        'real_goals': real_goals,
-        'real_assists': real_assists,
-        'real_yellow_cards': real_yellow_cards,
-        'real_red_cards': real_red_cards,
+        'membership_history': membership_history,
     })
 
 def player_create(request):
@@ -105,11 +181,12 @@ def player_delete(request, pk):
         return redirect('main:player_list')
     return render(request, 'main/players/player_confirm_delete.html', {'player': player})
 
-def stats_dashboard(request):
+def dashboard_filters(request):
+    """Matches, players and period label selected by the dashboard's GET filters."""
     selected_category = request.GET.get('category', '')
     selected_period = request.GET.get('period', 'all')
     today = date.today()
-    
+
     date_filter = None
     if selected_period == 'month':
         date_filter = today - timedelta(days=30)
@@ -119,7 +196,7 @@ def stats_dashboard(request):
         period_label = "Zadnjih godinu dana"
     else:
         period_label = "Od uvijek"
-        
+
     matches = Match.objects.all()
     if date_filter:
         matches = matches.filter(date__gte=date_filter)
@@ -129,114 +206,171 @@ def stats_dashboard(request):
     players = Player.objects.all()
     if selected_category:
         players = players.filter(category=selected_category)
-    
-    goals_queryset = (
-        Goal.objects.filter(match__in=matches)
+
+    return {
+        'selected_category': selected_category,
+        'selected_period': selected_period,
+        'period_label': period_label,
+        'matches': matches,
+        'players': players,
+    }
+
+def format_data(queryset):
+    return [
+        {
+            "name": f"{item.get('first_name') or item.get('player__first_name')} {item.get('last_name') or item.get('player__last_name')}",
+            "value": item.get('total') or 0,
+            "category": item.get('category') or item.get('player__category', '')
+        } for item in queryset
+    ]
+
+def event_leaderboard(events, limit):
+    return format_data(
+        events
         .values('player__id', 'player__first_name', 'player__last_name', 'player__category')
         .annotate(total=Count('id'))
-        .order_by('-total')[:15]
+        .order_by('-total')[:limit]
     )
-    
-    assists_queryset = (
-        Assist.objects.filter(match__in=matches)
-        .values('player__id', 'player__first_name', 'player__last_name', 'player__category')
-        .annotate(total=Count('id'))
+
+def goals_series(filters):
+    return event_leaderboard(Goal.objects.filter(match__in=filters['matches']), 15)
+
+def assists_series(filters):
+    return event_leaderboard(Assist.objects.filter(match__in=filters['matches']), 15)
+
+def yellow_cards_series(filters):
+    return event_leaderboard(Card.objects.filter(match__in=filters['matches'], card_type='Y'), 10)
+
+def red_cards_series(filters):
+    return event_leaderboard(Card.objects.filter(match__in=filters['matches'], card_type='R'), 10)
+
+def appearances_series(filters):
+    # A player is never both starter and substitute in the same match, so the
+    # two distinct counts add up to the number of matches played.
+    matches = filters['matches']
+    return format_data(
+        filters['players']
+        .annotate(total=(
+            Count('starts', filter=Q(starts__in=matches), distinct=True)
+            + Count('bench', filter=Q(bench__in=matches), distinct=True)
+        ))
+        .filter(total__gt=0)
+        .values('first_name', 'last_name', 'category', 'total')
         .order_by('-total')[:15]
     )
-    
-    appearances_queryset = []
-    for player in players:
-        player_matches = matches.filter(
-            Q(starting_players=player) | Q(bench_players=player)
-        ).distinct()
-        
-        if player_matches.exists():
-            appearances_queryset.append({
-                'player__id': player.id,
-                'player__first_name': player.first_name,
-                'player__last_name': player.last_name,
-                'player__category': player.category,
-                'total': player_matches.count()
-            })
-    
-    appearances_queryset = sorted(appearances_queryset, key=lambda x: x['total'], reverse=True)[:15]
-    
-    yellow_cards_queryset = (
-        Card.objects.filter(match__in=matches, card_type='Y')
-        .values('player__id', 'player__first_name', 'player__last_name', 'player__category')
-        .annotate(total=Count('id'))
-        .order_by('-total')[:10]
-    )
-    
-    red_cards_queryset = (
-        Card.objects.filter(match__in=matches, card_type='R')
-        .values('player__id', 'player__first_name', 'player__last_name', 'player__category')
-        .annotate(total=Count('id'))
-        .order_by('-total')[:10]
+
+def category_stats_series(filters):
+    if filters['selected_category']:
+        return []
+    rows = {
+        row['category']: row
+        for row in filters['matches'].values('category').annotate(
+            matches=Count('id', distinct=True),
+            goals=Count('goals', distinct=True),
+            wins=Count('id', filter=Q(home_score__gt=F('away_score')), distinct=True),
+        )
+    }
+    return [
+        {
+            'category': cat_name,
+            'matches': rows[cat_code]['matches'],
+            'goals': rows[cat_code]['goals'],
+            'wins': rows[cat_code]['wins'],
+        }
+        for cat_code, cat_name in CATEGORIES if cat_code in rows
+    ]
+
+DASHBOARD_SERIES = {
+    'goals': goals_series,
+    'assists': assists_series,
+    'appearances': appearances_series,
+    'yellow_cards': yellow_cards_series,
+    'red_cards': red_cards_series,
+    'category_stats': category_stats_series,
+}
+
+CLUB_TOTALS = {
+    'total_matches': Count('id'),
+    'total_goals_conceded': Sum('away_score'),
+    'wins': Count('id', filter=Q(home_score__gt=F('away_score'))),
+    'draws': Count('id', filter=Q(home_score=F('away_score'))),
+    'losses': Count('id', filter=Q(home_score__lt=F('away_score'))),
+}
+
+def club_summary(filters):
+    matches = filters['matches']
+    return summarize_club(
+        matches.aggregate(**CLUB_TOTALS),
+        Goal.objects.filter(match__in=matches).count(),
     )
-    
-    total_matches = matches.count()
-    total_goals_scored = Goal.objects.filter(match__in=matches).count()
-    total_goals_conceded = matches.aggregate(Sum('away_score'))['away_score__sum'] or 0
-    
-    wins = matches.filter(home_score__gt=F('away_score')).count() if matches else 0
-    draws = matches.filter(home_score=F('away_score')).count() if matches else 0
-    losses = matches.filter(home_score__lt=F('away_score')).count() if matches else 0
-    
+
+async def aclub_summary(filters):
+    matches = filters['matches']
+    totals = await matches.aaggregate(**CLUB_TOTALS)
+    goals_scored = await Goal.objects.filter(match__in=matches).acount()
+    return summarize_club(totals, goals_scored)
+
+def summarize_club(totals, total_goals_scored):
+    total_matches = totals['total_matches']
+    total_goals_conceded = totals['total_goals_conceded'] or 0
+    wins, draws, losses = totals['wins'], totals['draws'], totals['losses']
+
     avg_goals_scored = round(total_goals_scored / total_matches, 2) if total_matches > 0 else 0
     avg_goals_conceded = round(total_goals_conceded / total_matches, 2) if total_matches > 0 else 0
-    
-    category_stats = []
-    if not selected_category:
-        for cat_code, cat_name in CATEGORIES:
-            cat_matches = matches.filter(category=cat_code)
-            if cat_matches.exists():
-                cat_goals = Goal.objects.filter(match__in=cat_matches).count()
-                category_stats.append({
-                    'category': cat_name,
-                    'matches': cat_matches.count(),
-                    'goals': cat_goals,
-                    'wins': cat_matches.filter(home_score__gt=F('away_score')).count(),
-                })
-    
-    def format_data(queryset):
-        return [
-            {
-                "name": f"{item.get('first_name') or item.get('player__first_name')} {item.get('last_name') or item.get('player__last_name')}",
-                "value": item.get('total') or 0,
-                "category": item.get('category') or item.get('player__category', '')
-            } for item in queryset
-        ]
-    
+
+    return {
+        'total_matches': total_matches,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'win_percentage': round((wins / total_matches * 100), 1) if total_matches > 0 else 0,
+        'total_goals_scored': total_goals_scored,
+        'total_goals_conceded': total_goals_conceded,
+        'goal_difference': total_goals_scored - total_goals_conceded,
+        'avg_goals_scored': avg_goals_scored,
+        'avg_goals_conceded': avg_goals_conceded,
+    }
+
+@conditional_page(lambda: [Match.objects.all(), Player.objects.all()])
+async def stats_dashboard(request):
+    filters = dashboard_filters(request)
+
+    # Leaderboards and per-category stats are fetched lazily from
+    # stats_dashboard_data so the page renders without computing them. The
+    # club summary is the only section computed here; if it misses
+    # DASHBOARD_SECTION_TIMEOUT the cards are replaced by a notice.
+    club_stats = (await arun_sections({'club_stats': aclub_summary}, filters))['club_stats']
     context = {
         'categories': CATEGORIES,
-        'selected_category': selected_category,
-        'selected_period': selected_period,
-        'period_label': period_label,
-        'goals': format_data(goals_queryset),
-        'assists': format_data(assists_queryset),
-        'appearances': format_data(appearances_queryset),
-        'yellow_cards': format_data(yellow_cards_queryset),
-        'red_cards': format_data(red_cards_queryset),
-        
-        'club_stats': {
-            'total_matches': total_matches,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'win_percentage': round((wins / total_matches * 100), 1) if total_matches > 0 else 0,
-            'total_goals_scored': total_goals_scored,
-            'total_goals_conceded': total_goals_conceded,
-            'goal_difference': total_goals_scored - total_goals_conceded,
-            'avg_goals_scored': avg_goals_scored,
-            'avg_goals_conceded': avg_goals_conceded,
-        },
-        'category_stats': category_stats,
+        'selected_category': filters['selected_category'],
+        'selected_period': filters['selected_period'],
+        'period_label': filters['period_label'],
+        'club_stats': club_stats,
+        'series_names': list(DASHBOARD_SERIES),
     }
 
     return render(request, 'main/stats_dashboard.html', context)
 
-def match_list(request):
+@cache_control(max_age=60)
+@conditional_page(lambda series: [Match.objects.all(), Player.objects.all()])
+async def stats_dashboard_data(request, series):
+    if series not in DASHBOARD_SERIES:
+        raise Http404("Nepoznata statistika.")
+    filters = dashboard_filters(request)
+    # Serija koja ne stigne unutar DASHBOARD_SECTION_TIMEOUT vraća 503, pa
+    # preglednik prikaže poruku umjesto da zahtjev visi.
+    data = (await arun_sections({series: DASHBOARD_SERIES[series]}, filters))[series]
+    if data is None:
+        return JsonResponse({'series': series, 'error': "Statistika trenutno nije dostupna."}, status=503)
+    return JsonResponse({
+        'series': series,
+        'category': filters['selected_category'],
+        'period': filters['selected_period'],
+        'data': data,
+    })
+
+@conditional_page(lambda: [Match.objects.all()])
+async def match_list(request):
     matches = Match.objects.all().order_by('-date')
 
     category = request.GET.get('category')
@@ -248,23 +382,28 @@ def match_list(request):
         matches = matches.filter(date=date)
 
     return render(request, "main/matches/match_list.html", {
-        "matches": matches,
+        "matches": await alist(matches),
         "filter_values": {"category": category, "date": date},
         'categories': CATEGORIES
     })
 
-def match_detail(request, pk):
-    match = get_object_or_404(Match, pk=pk)
+@conditional_page(lambda pk: [
+    Match.objects.filter(pk=pk),
+    Player.objects.filter(Q(starts=pk) | Q(bench=pk)),
+])
+async def match_detail(request, pk):
+    match = await aget_object_or_404(Match.objects.select_related('captain', 'goalkeeper'), pk=pk)
     
-    valid_players = match.starting_players.all() | match.bench_players.all()
-    active_valid_players = valid_players.filter(is_active_member=True).exclude(member_until__lt=date.today())
+    active_valid_players = await sync_to_async(
+        lambda: Player.objects.eligible_on(match.date, match.category).in_lineup(match)
+    )()
 
     if request.method == "POST":
         form = MatchEventForm(request.POST)
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
             event = form.save(commit=False)
             event.match = match
-            event.save()
+            await event.asave()
             return redirect("main:match_detail", pk=pk)
     else:
         form = MatchEventForm()
@@ -272,22 +411,34 @@ def match_detail(request, pk):
     forms = {}
     for form_name, form_class in [('goal_form', GoalEventForm), ('assist_form', AssistEventForm), ('card_form', CardEventForm)]:
         forms[form_name] = form_class()
-        forms[form_name].fields['player'].queryset = active_valid_players.distinct()
+        forms[form_name].fields['player'].queryset = active_valid_players
 
-    return render(request, "main/matches/match_detail.html", {
+    # Sastav i događaji predaju se kao lijeni upiti: izvršavaju se tek kad
+    # predložak promaši predmemorirani fragment. Zato se predložak renderira
+    # u sinkronom kontekstu, gdje smije pokretati upite.
+    return await sync_to_async(render)(request, "main/matches/match_detail.html", {
         "match": match,
         "form": form,
+        "match_version": match_cache_version(match),
+        "fragment_timeout": settings.MATCH_FRAGMENT_CACHE_TIMEOUT,
+        "starting_players": match.starting_players.all(),
+        "bench_players": match.bench_players.all(),
+        "goals": match.goals.select_related('player'),
+        "assists": match.assists.select_related('player'),
+        "cards": match.cards.select_related('player'),
+        "lineup_players": active_valid_players.order_by('last_name', 'first_name'),
         **forms
     })
 
 def match_create(request):
     category = request.GET.get('category') or request.POST.get('category')
-    valid_players = Player.objects.filter(category=category) if category else Player.objects.none()
+    form = MatchForm(request.POST) if request.method == "POST" else None
+    match_day = form.match_day() if form else date.today()
+    valid_players = Player.objects.eligible_on(match_day, category) if category else Player.objects.none()
     
     formset_kwargs = {'form_kwargs': {'valid_players': valid_players}}
     
     if request.method == "POST":
-        form = MatchForm(request.POST)
         formsets = {
             'goals': GoalFormSet(request.POST, prefix='goals', **formset_kwargs),
             'assists': AssistFormSet(request.POST, prefix='assists', **formset_kwargs),
@@ -299,11 +450,6 @@ def match_create(request):
             if not event_errors and all(fs.is_valid() for fs in formsets.values()):
                 match = form.save()
                 
-                all_players = form.cleaned_data['starting_players'] | form.cleaned_data.get('bench_players', Player.objects.none())
-                for player in all_players:
-                    player.appearances += 1
-                    player.save()
-                
                 for event_type, formset in formsets.items():
                     model_class = {'goals': Goal, 'assists': Assist, 'cards': Card}[event_type]
                     for event_form in formset:
@@ -335,7 +481,7 @@ def match_create(request):
 
 def match_update(request, pk):
     match = get_object_or_404(Match, pk=pk)
-    valid_players = Player.objects.filter(category=match.category)
+    valid_players = Player.objects.eligible_on(match.date, match.category) | Player.objects.in_lineup(match)
     formset_kwargs = {'form_kwargs': {'valid_players': valid_players}}
 
     if request.method == "POST":
@@ -347,19 +493,22 @@ def match_update(request, pk):
         }
 
         if form.is_valid() and all(fs.is_valid() for fs in formsets.values()):
-            form.save()
-            
-            match.goals.all().delete()
-            match.assists.all().delete()
-            match.cards.all().delete()
-
-            models_map = {'goals': Goal, 'assists': Assist, 'cards': Card}
-            for event_type, formset in formsets.items():
-                model_class = models_map[event_type]
-                for event_form in formset:
-                    if event_form.cleaned_data and not event_form.cleaned_data.get('DELETE'):
-                        data = {k: v for k, v in event_form.cleaned_data.items() if k not in ['DELETE', 'id']}
-                        model_class.objects.create(match=match, **data)
+            # Signali sastava i događaja samo skupljaju zapise dnevnika; oni i
+            # vrijeme izmjene utakmice upisuju se jednom, na kraju bloka.
+            with batched_events():
+                form.save()
+
+                match.goals.all().delete()
+                match.assists.all().delete()
+                match.cards.all().delete()
+
+                models_map = {'goals': Goal, 'assists': Assist, 'cards': Card}
+                for event_type, formset in formsets.items():
+                    model_class = models_map[event_type]
+                    for event_form in formset:
+                        if event_form.cleaned_data and not event_form.cleaned_data.get('DELETE'):
+                            data = {k: v for k, v in event_form.cleaned_data.items() if k not in ['DELETE', 'id']}
+                            model_class.objects.create(match=match, **data)
 
             return redirect("main:match_detail", pk=match.pk)
     else:
@@ -393,25 +542,6 @@ def match_update(request, pk):
 def match_delete(request, pk):
     match = get_object_or_404(Match, pk=pk)
     if request.method == "POST":
-        for goal in match.goals.all():
-            goal.player.goals = max(goal.player.goals - 1, 0)
-            goal.player.save()
-
-        for assist in match.assists.all():
-            assist.player.assists = max(assist.player.assists - 1, 0)
-            assist.player.save()
-
-        for card in match.cards.all():
-            if card.card_type == 'Y':
-                card.player.yellow_cards = max(card.player.yellow_cards - 1, 0)
-            elif card.card_type == 'R':
-                card.player.red_cards = max(card.player.red_cards - 1, 0)
-            card.player.save()
-
-        for player in match.starting_players.all() | match.bench_players.all():
-            player.appearances = max(player.appearances - 1, 0)
-            player.save()
-
         match.delete()
         return redirect("main:match_list")
 
@@ -420,24 +550,88 @@ def match_delete(request, pk):
 def add_event(request, match_id, event_type):
     match = get_object_or_404(Match, pk=match_id)
     if request.method == 'POST':
-        player_id = request.POST['player']
-        player = get_object_or_404(Player, id=player_id)
-        
-        if not player.is_active_member:
+        player_id = request.POST.get('player', '')
+        # Igrač mora biti u sastavu i smjeti igrati na dan utakmice; jedan upit.
+        eligible = Player.objects.in_lineup(match).eligible_ids([player_id], match.date, match.category)
+        if not eligible:
             return redirect('main:match_detail', pk=match_id)
+        player_id = eligible.pop()
         
         minute = request.POST['minute']
         
         if event_type == 'goal':
-            Goal.objects.create(match=match, player=player, minute=minute)
+            Goal.objects.create(match=match, player_id=player_id, minute=minute)
         elif event_type == 'assist':
-            Assist.objects.create(match=match, player=player, minute=minute)
+            Assist.objects.create(match=match, player_id=player_id, minute=minute)
         elif event_type == 'card':
             card_type = request.POST['card_type']
-            Card.objects.create(match=match, player=player, minute=minute, card_type=card_type)
+            Card.objects.create(match=match, player_id=player_id, minute=minute, card_type=card_type)
     
     return redirect('main:match_detail', pk=match_id)
 
+MAX_BATCH_EVENTS = 50
+BATCH_EVENT_MODELS = {'goal': Goal, 'assist': Assist, 'card': Card}
+BATCH_LOG_TYPES = {'goal': 'GOAL', 'assist': 'ASSIST', 'Y': 'YELLOW', 'R': 'RED'}
+
+@require_POST
+def add_events(request, match_id):
+    """Record a JSON batch of events and return the updated event lists.
+
+    Body: ``{"events": [{"type": "goal|assist|card", "player": id,
+    "minute": n, "card_type": "Y|R"}, ...]}``. The whole batch is rejected
+    with 400 and per-event errors if any event is invalid; otherwise the
+    events are inserted with one bulk_create per type and the player
+    counters follow after commit with a single UPDATE.
+    """
+    match = get_object_or_404(Match, pk=match_id)
+    try:
+        submitted = json.loads(request.body)['events']
+    except (ValueError, KeyError, TypeError):
+        submitted = None
+    if not isinstance(submitted, list) or not 0 < len(submitted) <= MAX_BATCH_EVENTS:
+        return JsonResponse({'errors': {'events': f"Očekuje se lista od 1 do {MAX_BATCH_EVENTS} događaja."}}, status=400)
+
+    event_forms = [BatchEventForm(event if isinstance(event, dict) else {}) for event in submitted]
+    errors = {index: form.errors for index, form in enumerate(event_forms) if not form.is_valid()}
+    if not errors:
+        # Svi igrači serije provjeravaju se jednim upitem nad sastavom utakmice.
+        eligible = Player.objects.in_lineup(match).eligible_ids(
+            {form.cleaned_data['player'] for form in event_forms}, match.date, match.category
+        )
+        errors = {
+            index: {'player': ["Igrač nije u sastavu ili ne smije nastupiti na ovoj utakmici."]}
+            for index, form in enumerate(event_forms) if form.cleaned_data['player'] not in eligible
+        }
+    if errors:
+        return JsonResponse({'errors': errors}, status=400)
+
+    rows = {event_type: [] for event_type in BATCH_EVENT_MODELS}
+    entries = []
+    for form in event_forms:
+        data = form.cleaned_data
+        fields = {'match': match, 'player_id': data['player'], 'minute': data['minute']}
+        if data['type'] == 'card':
+            fields['card_type'] = data['card_type']
+        rows[data['type']].append(BATCH_EVENT_MODELS[data['type']](**fields))
+        log_type = BATCH_LOG_TYPES[data['card_type'] if data['type'] == 'card' else data['type']]
+        entries.append(log_entry(match.pk, data['player'], log_type, data['minute']))
+
+    # bulk_create ne šalje signale: dnevnik i vrijeme izmjene utakmice (ujedno
+    # ključ predmemoriranih fragmenata) ažuriraju se ovdje, jednom za seriju;
+    # brojači igrača slijede nakon potvrde transakcije.
+    with transaction.atomic():
+        for event_type, objects in rows.items():
+            if objects:
+                BATCH_EVENT_MODELS[event_type].objects.bulk_create(objects)
+        record_events(entries)
+        touch_matches(match.pk)
+
+    return render(request, "main/matches/match_events.html", {
+        "goals": match.goals.select_related('player'),
+        "assists": match.assists.select_related('player'),
+        "cards": match.cards.select_related('player'),
+    })
+
 def add_goal(request, match_id):
     return add_event(request, match_id, 'goal')
 
@@ -10,22 +10,32 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+# Production deployments override these through DJANGO_* environment variables.
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-gc=ff35)e!nubmf@1pbge1h7totx&n9irvj+j0dc)5*hz_oygf'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-gc=ff35)e!nubmf@1pbge1h7totx&n9irvj+j0dc)5*hz_oygf')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', True)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -56,7 +66,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -64,6 +73,14 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept in memory instead of being
+            # re-parsed from disk on every render.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -74,12 +91,91 @@ WSGI_APPLICATION = 'nkss.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DJANGO_DB_ENGINE selects the backend: 'sqlite' (default) or 'postgresql'.
+# Connections are kept open between requests for DJANGO_CONN_MAX_AGE seconds
+# and health-checked before reuse instead of being reopened on every request.
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+CONN_MAX_AGE = int(os.environ.get('DJANGO_CONN_MAX_AGE', '600'))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'nkss'),
+            'USER': os.environ.get('DJANGO_DB_USER', 'nkss'),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    # psycopg 3 connection pool; Django does not allow pooling together
+    # with persistent connections, so CONN_MAX_AGE is reset to 0.
+    if env_bool('DJANGO_DB_POOL'):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', '10')),
+        }
+else:
+    # mmap_size serves reads from memory-mapped pages and busy_timeout makes
+    # a writer wait for the lock instead of failing. WAL (readers and a writer
+    # work concurrently; synchronous=NORMAL is safe in WAL mode and avoids an
+    # fsync per commit) is persisted in the database file itself, so it is
+    # only switched on for a database configured through DJANGO_DB_NAME and
+    # the db.sqlite3 kept in the repository is left untouched. The pragmas
+    # run on every new connection.
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_PRAGMAS = [f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};', 'PRAGMA mmap_size=134217728;']
+    if os.environ.get('DJANGO_DB_NAME'):
+        SQLITE_PRAGMAS[:0] = ['PRAGMA journal_mode=WAL;', 'PRAGMA synchronous=NORMAL;']
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ''.join(SQLITE_PRAGMAS),
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Redis is used when DJANGO_REDIS_URL is set so that all workers share cached
+# fragments; otherwise every process keeps its own in-memory cache.
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'nkss',
+        }
+    }
+
+# Lifetime of cached match_detail fragments. Their keys include the match's
+# updated_at, which moves whenever the match, its lineup or one of its events
+# changes, so a stale fragment is never served even from a per-process cache.
+MATCH_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('DJANGO_MATCH_FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# Time limit (seconds) of a dashboard section: a series requested from
+# stats_dashboard_data that misses it is answered with 503, a club summary
+# with a notice. Synchronous series run in a pool of this many threads.
+DASHBOARD_SECTION_TIMEOUT = float(os.environ.get('DJANGO_DASHBOARD_SECTION_TIMEOUT', 2))
+DASHBOARD_SECTION_WORKERS = int(os.environ.get('DJANGO_DASHBOARD_SECTION_WORKERS', 4))
 
 
 # Password validation
@@ -122,6 +218,28 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+STATIC_ROOT = Path(os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles'))
+
+# Third-party CSS/JS is vendored under static/vendor/. collectstatic writes
+# every file under a content-hashed name, so it can be cached forever and is
+# re-downloaded only when its content changes.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+    },
+}
+
+# With WhiteNoise installed (pip install "whitenoise[brotli]") the app serves
+# its own static files: collectstatic additionally writes gzip and brotli
+# variants, and hashed files are sent with far-future immutable cache headers.
+if find_spec('whitenoise'):
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+                      'whitenoise.middleware.WhiteNoiseMiddleware')
+    STORAGES['staticfiles']['BACKEND'] = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
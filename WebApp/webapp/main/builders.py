@@ -0,0 +1,124 @@
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .caching import invalidate_category_choices
+from .models import Category, Match, MatchPlayer, Player, PlayerMatchStat
+
+DEFAULT_CATEGORIES = ["U9", "U11", "Mladi pioniri", "Stariji pioniri", "Juniori", "Seniori", "Veterani"]
+FIRST_NAMES = ["Ivan", "Luka", "Marko", "Josip", "Petar", "Ante", "Matej", "Filip", "Karlo", "Domagoj",
+               "Nikola", "Tomislav", "Mario", "Stjepan", "Dario", "Bruno", "Leon", "Fran", "Roko", "Jakov"]
+LAST_NAMES = ["Horvat", "Kovačević", "Babić", "Marić", "Jurić", "Novak", "Kovačić", "Knežević", "Vuković",
+              "Marković", "Petrović", "Matić", "Tomić", "Pavlović", "Božić", "Blažević", "Grgić", "Perić"]
+OPPONENTS = ["NK Rovinj", "NK Pula", "NK Poreč", "NK Umag", "NK Pazin", "NK Buje", "NK Labin", "NK Vodnjan",
+             "NK Novigrad", "NK Medulin", "NK Funtana", "NK Vrsar"]
+# Sastav momčadi po poziciji; ostatak kadra su rezerve raspoređene nasumično.
+SQUAD_POSITIONS = ["GK"] * 2 + ["DF"] * 7 + ["MF"] * 7 + ["FW"] * 4
+STARTERS = 11
+BENCH = 7
+
+
+class FixtureBuilder:
+    """Builds a large WebApp dataset in memory and writes it with bulk inserts.
+
+    Categories are loaded (or created) once; players, matches, lineups and
+    per-match stats are generated per category and saved with one
+    bulk_create per model, so the cost is a handful of queries per batch
+    instead of several per row.
+    """
+
+    def __init__(self, players_per_category=25, matches_per_category=30, seed=None, batch_size=1000):
+        self.players_per_category = max(players_per_category, STARTERS + BENCH)
+        self.matches_per_category = matches_per_category
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+
+    def categories(self):
+        categories = list(Category.objects.all())
+        if not categories:
+            categories = Category.objects.bulk_create([Category(name=name) for name in DEFAULT_CATEGORIES])
+            invalidate_category_choices()
+        return categories
+
+    def players(self, category):
+        return [
+            Player(
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                date_of_birth=date(2000, 1, 1) + timedelta(days=self.random.randint(0, 365 * 10)),
+                position=SQUAD_POSITIONS[i] if i < len(SQUAD_POSITIONS) else self.random.choice(SQUAD_POSITIONS),
+                category=category,
+            )
+            for i in range(self.players_per_category)
+        ]
+
+    def matches(self, category):
+        start = date.today() - timedelta(weeks=self.matches_per_category)
+        return [
+            Match(
+                date=start + timedelta(weeks=i),
+                opponent=self.random.choice(OPPONENTS),
+                location=self.random.choice(["Smoljanci", "Gostujući teren"]),
+                category=category,
+            )
+            for i in range(self.matches_per_category)
+        ]
+
+    def lineup(self, squad):
+        goalkeepers = [player for player in squad if player.position == "GK"]
+        outfield = [player for player in squad if player.position != "GK"]
+        starters = [self.random.choice(goalkeepers)] + self.random.sample(outfield, STARTERS - 1)
+        bench = self.random.sample([player for player in squad if player not in starters], BENCH)
+        return starters, bench
+
+    def stats(self, match, starters, bench):
+        # Golove zabijaju uglavnom starteri iz polja, asistencija prati oko 70% golova.
+        scorers = [player for player in starters if player.position != "GK"] + bench[:3]
+        goals, assists = Counter(), Counter()
+        for _ in range(self.random.choice([0, 1, 1, 2, 2, 2, 3, 3, 4, 5])):
+            scorer = self.random.choice(scorers)
+            goals[scorer] += 1
+            if self.random.random() < 0.7:
+                assists[self.random.choice([player for player in scorers if player is not scorer])] += 1
+        return [
+            PlayerMatchStat(match=match, player=player, goals=goals[player], assists=assists[player])
+            for player in goals.keys() | assists.keys()
+        ]
+
+    @transaction.atomic
+    def build(self):
+        categories = self.categories()
+        squads = {category.pk: self.players(category) for category in categories}
+        Player.objects.bulk_create(
+            [player for squad in squads.values() for player in squad], batch_size=self.batch_size
+        )
+        matches = Match.objects.bulk_create(
+            [match for category in categories for match in self.matches(category)], batch_size=self.batch_size
+        )
+
+        lineups, stats = [], []
+        for match in matches:
+            starters, bench = self.lineup(squads[match.category_id])
+            captain = self.random.choice(starters)
+            lineups += [MatchPlayer(match=match, player=player, is_captain=player is captain)
+                        for player in starters + bench]
+            stats += self.stats(match, starters, bench)
+        MatchPlayer.objects.bulk_create(lineups, batch_size=self.batch_size)
+        PlayerMatchStat.objects.bulk_create(stats, batch_size=self.batch_size)
+
+        # Ukupni golovi i asistencije igrača odgovaraju statistici po utakmicama.
+        for stat in stats:
+            stat.player.goals += stat.goals
+            stat.player.assists += stat.assists
+        players = [player for squad in squads.values() for player in squad]
+        Player.objects.bulk_update(players, ['goals', 'assists'], batch_size=self.batch_size)
+
+        return {
+            'categories': len(categories),
+            'players': len(players),
+            'matches': len(matches),
+            'lineups': len(lineups),
+            'stats': len(stats),
+        }
@@ -0,0 +1,22 @@
+from django.core.cache import cache
+
+from .models import Category
+
+CATEGORY_CHOICES_KEY = 'categories:choices'
+# Brisanje ključa pri upisu vidi samo proces koji je upisivao (LocMem je
+# zaseban po procesu, a bulk_create ne šalje signale), pa ostali procesi
+# osvježavaju popis najkasnije nakon ovoliko sekundi.
+CATEGORY_CHOICES_TIMEOUT = 5 * 60
+
+
+def category_choices():
+    """(pk, name) pairs for category dropdowns, cached for CATEGORY_CHOICES_TIMEOUT."""
+    choices = cache.get(CATEGORY_CHOICES_KEY)
+    if choices is None:
+        choices = list(Category.objects.order_by('name').values_list('pk', 'name'))
+        cache.set(CATEGORY_CHOICES_KEY, choices, CATEGORY_CHOICES_TIMEOUT)
+    return choices
+
+
+def invalidate_category_choices():
+    cache.delete(CATEGORY_CHOICES_KEY)
@@ -11,6 +11,8 @@ class CategoryFactory(DjangoModelFactory):
     class Meta:
         model = Category
 
+    name = factory.Sequence(lambda n: f"Kategorija {n}")
+
 
 # PLAYER
 class PlayerFactory(DjangoModelFactory):
@@ -21,7 +23,8 @@ class PlayerFactory(DjangoModelFactory):
     last_name = factory.Faker('last_name')
     date_of_birth = factory.Faker('date_of_birth')
     position = factory.Iterator(['GK', 'DF', 'MF', 'FW'])
-    category = factory.LazyFunction(lambda: random.choice(Category.objects.all()))
+    # Queryset se dohvaća jednom i zatim ciklički koristi, ne za svakog igrača.
+    category = factory.Iterator(Category.objects.all())
     goals = factory.LazyAttribute(lambda _: random.randint(0, 30))
     assists = factory.LazyAttribute(lambda _: random.randint(0, 30))
 
@@ -34,7 +37,7 @@ class MatchFactory(DjangoModelFactory):
     date = factory.Faker('date_this_decade')
     opponent = factory.Faker('company')
     location = factory.Faker('city')
-    category = factory.SubFactory(CategoryFactory)
+    category = factory.Iterator(Category.objects.all())
 
 
 # MATCH PLAYER
@@ -43,7 +46,7 @@ class MatchPlayerFactory(DjangoModelFactory):
         model = MatchPlayer
 
     match = factory.SubFactory(MatchFactory)
-    player = factory.SubFactory(PlayerFactory)
+    player = factory.SubFactory(PlayerFactory, category=factory.SelfAttribute('..match.category'))
     is_captain = factory.Faker('boolean', chance_of_getting_true=10)
 
 
@@ -53,7 +56,7 @@ class PlayerMatchStatFactory(DjangoModelFactory):
         model = PlayerMatchStat
 
     match = factory.SubFactory(MatchFactory)
-    player = factory.SubFactory(PlayerFactory)
+    player = factory.SubFactory(PlayerFactory, category=factory.SelfAttribute('..match.category'))
     goals = factory.LazyAttribute(lambda _: random.randint(0, 3))
     assists = factory.LazyAttribute(lambda _: random.randint(0, 3))
 
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Player, Match
+from django.db import transaction
+from .models import Player, Match, MatchPlayer
 
 class PlayerForm(forms.ModelForm):
     class Meta:
@@ -30,6 +31,10 @@ class MatchWithPlayersForm(MatchForm):
         label="Kapetan"
     )
 
+    class Meta(MatchForm.Meta):
+        # Postava se sprema kroz starters/substitutes, ne kroz players.
+        fields = ['date', 'opponent', 'location', 'category']
+
     def __init__(self, *args, **kwargs):
         category = kwargs.pop('category', None)
         super().__init__(*args, **kwargs)
@@ -43,19 +48,42 @@ class MatchWithPlayersForm(MatchForm):
     def clean(self):
         cleaned_data = super().clean()
         starters = cleaned_data.get("starters")
-        substitutes = cleaned_data.get("substitutes")
         captain = cleaned_data.get("captain")
+        if starters is None:
+            return cleaned_data
+
+        # Provjere nad već dohvaćenim igračima, bez dodatnih upita.
+        starters = list(starters)
+        starter_ids = {player.pk for player in starters}
+        substitutes = [player for player in cleaned_data.get("substitutes") or [] if player.pk not in starter_ids]
 
-        if starters.count() != 11:
+        if len(starters) != 11:
             raise forms.ValidationError("Mora biti točno 11 igrača u prvoj postavi.")
 
-        if substitutes.count() > 7:
+        if len(substitutes) > 7:
             raise forms.ValidationError("Na klupi može biti najviše 7 igrača.")
 
-        if captain not in starters and captain not in substitutes:
+        if captain and captain.pk not in starter_ids | {player.pk for player in substitutes}:
             raise forms.ValidationError("Kapetan mora biti među starterima ili na klupi.")
 
         # Provjera da je barem 1 golman među starterima
-        gk_count = starters.filter(position='GK').count()
-        if gk_count < 1:
-            raise forms.ValidationError("Mora biti barem jedan golman u prvoj postavi.")
\ No newline at end of file
+        if not any(player.position == 'GK' for player in starters):
+            raise forms.ValidationError("Mora biti barem jedan golman u prvoj postavi.")
+
+        cleaned_data["starters"] = starters
+        cleaned_data["substitutes"] = substitutes
+        return cleaned_data
+
+    def lineup(self, match):
+        captain = self.cleaned_data["captain"]
+        return [
+            MatchPlayer(match=match, player=player, is_captain=(player.pk == captain.pk))
+            for player in self.cleaned_data["starters"] + self.cleaned_data["substitutes"]
+        ]
+
+    @transaction.atomic
+    def save(self, commit=True):
+        match = super().save(commit=commit)
+        if commit:
+            MatchPlayer.objects.bulk_create(self.lineup(match))
+        return match
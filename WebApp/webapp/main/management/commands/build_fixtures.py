@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.builders import FixtureBuilder
+
+
+class Command(BaseCommand):
+    help = "Puni bazu velikim skupom igrača, utakmica, postava i statistike za mjerenja."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players-per-category', type=int, default=25)
+        parser.add_argument('--matches-per-category', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=1,
+                            help="Koliko puta ponoviti izgradnju (svaki krug dodaje novi skup).")
+        parser.add_argument('--seed', type=int, help="Sjeme generatora za ponovljive podatke.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        builder = FixtureBuilder(
+            players_per_category=options['players_per_category'],
+            matches_per_category=options['matches_per_category'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        totals = {}
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            for key, count in builder.build().items():
+                totals[key] = totals.get(key, 0) + count
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(f"{key}: {count}" for key, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"Izgrađeno za {elapsed:.2f} s - {summary}."))
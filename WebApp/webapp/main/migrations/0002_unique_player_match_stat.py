@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_stats(apps, schema_editor):
+    # Duplicate rows per (match, player) are folded into the oldest one so
+    # the unique constraint can be added.
+    PlayerMatchStat = apps.get_model('main', 'PlayerMatchStat')
+    duplicates = (
+        PlayerMatchStat.objects.values('match', 'player')
+        .annotate(rows=Count('id'), keep=Min('id'), goals_total=Sum('goals'), assists_total=Sum('assists'))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        PlayerMatchStat.objects.filter(pk=row['keep']).update(goals=row['goals_total'], assists=row['assists_total'])
+        PlayerMatchStat.objects.filter(match=row['match'], player=row['player']).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_stats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='playermatchstat',
+            constraint=models.UniqueConstraint(fields=('match', 'player'), name='unique_player_match_stat'),
+        ),
+    ]
@@ -1,5 +1,4 @@
 from django.db import models
-from django.core.validators import MinValueValidator, MaxValueValidator
 
 POSITIONS = [
     ("GK", "Goalkeeper"),
@@ -8,81 +7,80 @@ POSITIONS = [
     ("FW", "Forward"),
 ]
 
-CATEGORIES = [
-    ("U9", "U9"),
-    ("U11", "U11"),
-    ("MP", "Mladi pioniri"),
-    ("SP", "Stariji pioniri"),
-    ("JUN", "Juniori"),
-    ("SEN", "Seniori"),
-    ("VET", "Veterani"),
+STAFF_ROLES = [
+    ("coach", "Coach"),
+    ("physio", "Physiotherapist"),
+    ("president", "President"),
+    ("rep", "Club Representative"),
+    ("other", "Other"),
 ]
 
+class Category(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
 class Player(models.Model):
-    first_name = models.CharField(max_length=50)
-    last_name = models.CharField(max_length=50)
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
     date_of_birth = models.DateField()
     position = models.CharField(max_length=2, choices=POSITIONS)
-    category = models.CharField(max_length=3, choices=CATEGORIES)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     goals = models.PositiveIntegerField(default=0)
     assists = models.PositiveIntegerField(default=0)
-    yellow_cards = models.PositiveIntegerField(default=0)
-    red_cards = models.PositiveIntegerField(default=0)
-    appearances = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='player_last_name_idx'),
+            models.Index(fields=['first_name', 'last_name'], name='player_first_name_idx'),
+            models.Index(fields=['position', 'last_name'], name='player_position_idx'),
+            models.Index(fields=['date_of_birth'], name='player_birth_date_idx'),
+            models.Index(fields=['category', 'last_name'], name='player_category_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 class Match(models.Model):
-    HOME_AWAY = [("H", "Home"), ("A", "Away")]
-
     date = models.DateField()
-    home_or_away = models.CharField(max_length=1, choices=HOME_AWAY)
     opponent = models.CharField(max_length=100)
-    result = models.CharField(max_length=10)
-    starting_players = models.ManyToManyField(Player, related_name="starts")
-    bench_players = models.ManyToManyField(Player, related_name="bench", blank=True)
-    captain = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, related_name="captain_matches")
-    goalkeeper = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, related_name="goalkeeper_matches")
+    location = models.CharField(max_length=100)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
+    players = models.ManyToManyField(Player, through='MatchPlayer')
 
     def __str__(self):
         return f"NK Smoljanci Sloboda vs {self.opponent} ({self.date})"
 
-class MatchEvent(models.Model):
+class MatchPlayer(models.Model):
+    match = models.ForeignKey(Match, on_delete=models.CASCADE)
+    player = models.ForeignKey(Player, on_delete=models.CASCADE)
+    is_captain = models.BooleanField(default=False)
+
+class PlayerMatchStat(models.Model):
     match = models.ForeignKey(Match, on_delete=models.CASCADE)
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
-    minute = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(120)])
-    EVENT_TYPES = [
-        ("GOAL", "Goal"),
-        ("ASSIST", "Assist"),
-        ("YC", "Yellow Card"),
-        ("RC", "Red Card"),
-    ]
-    event_type = models.CharField(max_length=6, choices=EVENT_TYPES)
-
-    def save(self, *args, **kwargs):
-        # Automatic stats update
-        if not self.pk:
-            if self.event_type == "GOAL":
-                self.player.goals += 1
-            elif self.event_type == "ASSIST":
-                self.player.assists += 1
-            elif self.event_type == "YC":
-                self.player.yellow_cards += 1
-            elif self.event_type == "RC":
-                self.player.red_cards += 1
-            self.player.appearances += 1
-            self.player.save()
-        super().save(*args, **kwargs)
+    goals = models.PositiveIntegerField(default=0)
+    assists = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['match', 'player'], name='unique_player_match_stat'),
+        ]
 
 class StaffMember(models.Model):
     name = models.CharField(max_length=100)
-    role = models.CharField(max_length=100)
+    role = models.CharField(max_length=20, choices=STAFF_ROLES)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_role_display()})"
 
 class Meeting(models.Model):
     date = models.DateField()
-    notes = models.TextField()
+    subject = models.CharField(max_length=200)
+    minutes = models.TextField()
 
 class Equipment(models.Model):
     name = models.CharField(max_length=100)
     quantity = models.PositiveIntegerField()
+    date_acquired = models.DateField()
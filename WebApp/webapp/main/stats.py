@@ -0,0 +1,45 @@
+from collections import Counter
+
+from django.db import transaction
+
+from .models import PlayerMatchStat
+
+
+def tally(player_ids, allowed):
+    """Count submitted player ids, ignoring anything outside the lineup."""
+    return Counter(int(pk) for pk in player_ids if str(pk).isdigit() and int(pk) in allowed)
+
+
+def add_match_stats(match, scorers, assistants):
+    """Add one goal per scorer entry and one assist per assistant entry.
+
+    Submissions are tallied in memory and the new per-player totals are
+    written with a single upsert keyed on (match, player).
+    """
+    lineup = set(match.players.values_list('id', flat=True))
+    goals = tally(scorers, lineup)
+    assists = tally(assistants, lineup)
+    player_ids = goals.keys() | assists.keys()
+    if not player_ids:
+        return []
+
+    with transaction.atomic():
+        current = {
+            stat.player_id: stat
+            for stat in PlayerMatchStat.objects.select_for_update().filter(match=match, player_id__in=player_ids)
+        }
+        stats = []
+        for player_id in sorted(player_ids):
+            stat = current.get(player_id)
+            stats.append(PlayerMatchStat(
+                match=match,
+                player_id=player_id,
+                goals=(stat.goals if stat else 0) + goals[player_id],
+                assists=(stat.assists if stat else 0) + assists[player_id],
+            ))
+        return PlayerMatchStat.objects.bulk_create(
+            stats,
+            update_conflicts=True,
+            unique_fields=['match', 'player'],
+            update_fields=['goals', 'assists'],
+        )
@@ -1,3 +1,192 @@
+import time
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Q, Sum
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .builders import BENCH, DEFAULT_CATEGORIES, STARTERS, FixtureBuilder
+from .caching import CATEGORY_CHOICES_TIMEOUT, category_choices
+from .forms import MatchWithPlayersForm
+from .models import Category, Match, MatchPlayer, Player, PlayerMatchStat
+from .stats import add_match_stats
+from .views import PLAYERS_PER_PAGE
+
+
+def make_player(last_name, category=None, position='MF', first_name='Ivan'):
+    return Player.objects.create(first_name=first_name, last_name=last_name, date_of_birth=date(2000, 1, 1),
+                                 position=position, category=category)
+
+
+class MatchStatsTests(TestCase):
+    def setUp(self):
+        self.match = Match.objects.create(date=date(2024, 3, 1), opponent='NK Pula', location='Smoljanci')
+        self.players = [make_player(name) for name in ('Horvat', 'Babić', 'Marić')]
+        MatchPlayer.objects.bulk_create([MatchPlayer(match=self.match, player=player) for player in self.players[:2]])
+        self.outsider = self.players[2]
+
+    def totals(self):
+        return {
+            stat.player_id: (stat.goals, stat.assists)
+            for stat in PlayerMatchStat.objects.filter(match=self.match)
+        }
+
+    def test_duplicates_are_tallied(self):
+        horvat, babic = self.players[:2]
+        add_match_stats(self.match, [horvat.pk, str(horvat.pk), babic.pk], [babic.pk])
+        self.assertEqual(self.totals(), {horvat.pk: (2, 0), babic.pk: (1, 1)})
+
+    def test_repeated_submission_adds_to_existing_rows(self):
+        horvat, babic = self.players[:2]
+        add_match_stats(self.match, [horvat.pk], [])
+        add_match_stats(self.match, [horvat.pk], [babic.pk])
+        self.assertEqual(self.totals(), {horvat.pk: (2, 0), babic.pk: (0, 1)})
+        self.assertEqual(PlayerMatchStat.objects.count(), 2)
+
+    def test_players_outside_lineup_and_junk_are_ignored(self):
+        self.assertEqual(add_match_stats(self.match, [self.outsider.pk, 'x', ''], ['-1']), [])
+        self.assertFalse(PlayerMatchStat.objects.exists())
+
+    def test_view_posts_stats(self):
+        horvat = self.players[0]
+        url = reverse('main:match_add_stats', args=[self.match.pk])
+        response = self.client.post(url, {'scorers': [horvat.pk, horvat.pk], 'assistants': []})
+        self.assertRedirects(response, reverse('main:match_detail', args=[self.match.pk]), fetch_redirect_response=False)
+        self.assertEqual(self.totals(), {horvat.pk: (2, 0)})
+
+
+class PlayerListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seniors = Category.objects.create(name='Seniori')
+        for first_name, last_name, position in [('Luka', 'Babić', 'FW'), ('Ante', 'Horvat', 'GK'),
+                                                ('Marko', 'Anić', 'DF')]:
+            make_player(last_name, self.seniors, position, first_name)
+
+    def names(self, **params):
+        response = self.client.get(reverse('main:player_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [player.last_name for player in response.context['players']]
+
+    def test_sort_whitelist(self):
+        self.assertEqual(self.names(sort='first_name'), ['Horvat', 'Babić', 'Anić'])
+        self.assertEqual(self.names(sort='position'), ['Anić', 'Babić', 'Horvat'])
+        for sort in ('', 'password', '-last_name', 'category__name'):
+            with self.subTest(sort=sort):
+                self.assertEqual(self.names(sort=sort), ['Anić', 'Babić', 'Horvat'])
+
+    def test_filters_ignore_invalid_values(self):
+        make_player('Zorić')
+        self.assertEqual(self.names(category=self.seniors.pk), ['Anić', 'Babić', 'Horvat'])
+        self.assertEqual(len(self.names(category='abc', position='XX')), 4)
+        self.assertEqual(self.names(position='GK', search='hor'), ['Horvat'])
+
+    def test_pagination(self):
+        for index in range(PLAYERS_PER_PAGE):
+            make_player(f'Zorić{index:02d}', self.seniors)
+        response = self.client.get(reverse('main:player_list'), {'page': 2, 'sort': 'last_name'})
+        self.assertEqual([player.last_name for player in response.context['players']], ['Zorić22', 'Zorić23', 'Zorić24'])
+        self.assertEqual(response.context['query'], 'sort=last_name')
+
+    def test_category_choices_are_cached(self):
+        self.assertEqual(category_choices(), [(self.seniors.pk, 'Seniori')])
+        with self.assertNumQueries(0):
+            category_choices()
+        juniors = Category.objects.create(name='Juniori')
+        self.assertEqual(category_choices(), [(juniors.pk, 'Juniori'), (self.seniors.pk, 'Seniori')])
+
+    def test_category_choices_expire(self):
+        # Upis u drugom procesu ne briše ključ ovdje; vrijedi samo do isteka.
+        category_choices()
+        Category.objects.bulk_create([Category(name='Juniori')])
+        self.assertEqual(len(category_choices()), 1)
+        with mock.patch('django.core.cache.backends.locmem.time.time',
+                        return_value=time.time() + CATEGORY_CHOICES_TIMEOUT + 1):
+            self.assertEqual(len(category_choices()), 2)
+
+    def test_fixture_builder_refreshes_category_choices(self):
+        Category.objects.all().delete()
+        self.assertEqual(category_choices(), [])
+        FixtureBuilder().categories()
+        self.assertEqual(len(category_choices()), len(DEFAULT_CATEGORIES))
+
+
+class MatchLineupFormTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Seniori')
+        self.squad = [make_player(f'Igrač{index:02d}', self.category, 'GK' if index == 0 else 'MF')
+                      for index in range(14)]
+
+    def form(self, starters, substitutes=(), captain=None):
+        return MatchWithPlayersForm({
+            'date': '2024-03-01', 'opponent': 'NK Pula', 'location': 'Smoljanci', 'category': self.category.pk,
+            'starters': [player.pk for player in starters],
+            'substitutes': [player.pk for player in substitutes],
+            'captain': (captain or starters[0]).pk,
+        }, category=self.category)
+
+    def test_starters_are_removed_from_the_bench(self):
+        starters = self.squad[:11]
+        form = self.form(starters, [starters[3], self.squad[11], starters[5], self.squad[12]], captain=self.squad[12])
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['substitutes'], [self.squad[11], self.squad[12]])
+        with CaptureQueriesContext(connection) as queries:
+            match = form.save()
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "main_matchplayer"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(MatchPlayer.objects.filter(match=match).count(), 13)
+        self.assertEqual(MatchPlayer.objects.get(match=match, is_captain=True).player, self.squad[12])
+
+    def test_lineup_rules(self):
+        cases = {
+            'starters': self.form(self.squad[:10]),
+            'goalkeeper': self.form(self.squad[1:12]),
+            'captain': self.form(self.squad[:11], captain=self.squad[13]),
+        }
+        for rule, form in cases.items():
+            with self.subTest(rule=rule):
+                self.assertFalse(form.is_valid())
+                self.assertTrue(form.non_field_errors())
+
+    def test_players_of_other_categories_are_rejected(self):
+        outsider = make_player('Gost', Category.objects.create(name='Juniori'), 'GK')
+        form = self.form(self.squad[1:11] + [outsider])
+        self.assertFalse(form.is_valid())
+        self.assertIn('starters', form.errors)
+
+
+class FixtureBuilderTests(TestCase):
+    def test_build_is_consistent(self):
+        counts = FixtureBuilder(players_per_category=20, matches_per_category=3, seed=1).build()
+        self.assertEqual(counts['categories'], len(DEFAULT_CATEGORIES))
+        self.assertEqual(Player.objects.count(), 20 * len(DEFAULT_CATEGORIES))
+        self.assertEqual(Match.objects.count(), 3 * len(DEFAULT_CATEGORIES))
+        self.assertEqual(counts['lineups'], counts['matches'] * (STARTERS + BENCH))
+        lineups = MatchPlayer.objects.values('match').annotate(
+            players=Count('pk'), captains=Count('pk', filter=Q(is_captain=True)),
+            categories=Count('player__category', distinct=True),
+        )
+        for lineup in lineups:
+            self.assertEqual((lineup['players'], lineup['captains'], lineup['categories']), (STARTERS + BENCH, 1, 1))
+        totals = PlayerMatchStat.objects.aggregate(goals=Sum('goals'), assists=Sum('assists'))
+        self.assertEqual(Player.objects.aggregate(goals=Sum('goals'), assists=Sum('assists')), totals)
+
+    def test_query_count_does_not_grow_with_size(self):
+        Category.objects.create(name='Seniori')
+        with CaptureQueriesContext(connection) as small:
+            FixtureBuilder(matches_per_category=2, seed=1).build()
+        with CaptureQueriesContext(connection) as large:
+            FixtureBuilder(players_per_category=30, matches_per_category=6, seed=1).build()
+        self.assertEqual(len(large), len(small))
 
-# Create your tests here.
+    def test_command(self):
+        out = StringIO()
+        call_command('build_fixtures', '--matches-per-category=1', '--repeat=2', '--seed=3', stdout=out)
+        self.assertIn('matches: 14', out.getvalue())
+        self.assertEqual(Category.objects.count(), len(DEFAULT_CATEGORIES))
@@ -1,19 +1,28 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import MatchPlayer, Player, Match, PlayerMatchStat, Category, StaffMember, Equipment, Meeting
+from .models import POSITIONS, Player, Match, PlayerMatchStat, Category, StaffMember, Equipment, Meeting
 from .forms import MatchWithPlayersForm, PlayerForm, MatchForm
+from .stats import add_match_stats
+from .caching import category_choices
+from django.core.paginator import Paginator
 from django.db.models import Q
 
 def index(request):
     return render(request, 'main/index.html')
 # POPIS IGRAČA
-def player_list(request):
-    players = Player.objects.all()
+# Dopušteni ključevi sortiranja; svaki redoslijed prati indeks na Player.
+PLAYER_SORTS = {
+    'last_name': ('last_name', 'first_name', 'pk'),
+    'first_name': ('first_name', 'last_name', 'pk'),
+    'position': ('position', 'last_name', 'pk'),
+    'date_of_birth': ('date_of_birth', 'pk'),
+}
+PLAYERS_PER_PAGE = 25
+
 
-    # dohvat GET parametara
-    search = request.GET.get("search")
-    category = request.GET.get("category")
-    position = request.GET.get("position")
-    sort = request.GET.get("sort")
+def filter_players(players, params):
+    search = params.get("search", "").strip()
+    category = params.get("category", "")
+    position = params.get("position", "")
 
     # pretraga po imenu ili prezimenu
     if search:
@@ -23,27 +32,30 @@ def player_list(request):
         )
 
     # filtriranje po kategoriji
-    if category:
-        players = players.filter(category__name=category)
+    if category.isdigit():
+        players = players.filter(category_id=int(category))
 
     # filtriranje po poziciji
-    if position:
+    if position in dict(POSITIONS):
         players = players.filter(position=position)
 
-    # sortiranje
-    if sort:
-        players = players.order_by(sort)
+    # sortiranje samo po dopuštenim ključevima
+    return players.order_by(*PLAYER_SORTS.get(params.get("sort"), PLAYER_SORTS['last_name']))
 
-    # sve kategorije za dropdown
-    categories = (
-        Player.objects.values_list('category__name', flat=True)
-        .distinct()
-        .order_by('category__name')
-    )
+
+def player_list(request):
+    players = filter_players(Player.objects.select_related('category'), request.GET)
+    page = Paginator(players, PLAYERS_PER_PAGE).get_page(request.GET.get('page'))
+
+    query = request.GET.copy()
+    query.pop('page', None)
 
     context = {
-        'players': players,
-        'categories': categories,
+        'players': page,
+        'page_obj': page,
+        'query': query.urlencode(),
+        'categories': category_choices(),
+        'selected_category': request.GET.get('category', ''),
     }
     return render(request, 'main/players/player_list.html', context)
 
@@ -97,19 +109,8 @@ def match_add(request):
     if request.method == 'POST':
         form = MatchWithPlayersForm(request.POST, category=category)
         if form.is_valid():
-            match = form.save()
-            # Spremi startere i klupu
-            starters = form.cleaned_data['starters']
-            substitutes = form.cleaned_data['substitutes']
-            captain = form.cleaned_data['captain']
-
-            for player in starters:
-                MatchPlayer.objects.create(match=match, player=player, is_captain=(player == captain))
-
-            for player in substitutes:
-                if player not in starters:
-                    MatchPlayer.objects.create(match=match, player=player, is_captain=(player == captain))
-
+            # Utakmica i cijela postava spremaju se u jednoj transakciji.
+            form.save()
             return redirect('main:match_list')
     else:
         form = MatchWithPlayersForm(category=category)
@@ -130,22 +131,6 @@ def match_add_stats(request, match_id):
         scorers = request.POST.getlist('scorers')
         assistants = request.POST.getlist('assistants')
 
-        # Define or import the add_match_stats function
-        def add_match_stats(match, scorers, assistants):
-            for scorer in scorers:
-                PlayerMatchStat.objects.create(match=match, player_id=scorer, goals=1)
-
-            for assistant in assistants:
-                # Ako igrač već ima zapis za ovu utakmicu, samo povećaj asistencije
-                stat, created = PlayerMatchStat.objects.get_or_create(match=match, player_id=assistant)
-                if not created:
-                    stat.assists += 1
-                    stat.save()
-                else:
-                    stat.assists = 1
-                    stat.save()
-
-
         add_match_stats(match, scorers, assistants)
 
         return redirect('main:match_detail', pk=match.id)
@@ -10,22 +10,31 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+# Production deployments override these through DJANGO_* environment variables.
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-@)j0v&bc8+dw%^fjaxyxa3+^9k)=r6l5680ozqd40573!fm6(j'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-@)j0v&bc8+dw%^fjaxyxa3+^9k)=r6l5680ozqd40573!fm6(j')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', True)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -74,12 +83,52 @@ WSGI_APPLICATION = 'webapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DJANGO_DB_ENGINE: 'sqlite' (default) or 'postgresql'; connections are
+# reused for DJANGO_CONN_MAX_AGE seconds.
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+CONN_MAX_AGE = int(os.environ.get('DJANGO_CONN_MAX_AGE', '600'))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'webapp'),
+            'USER': os.environ.get('DJANGO_DB_USER', 'webapp'),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    # DJANGO_DB_POOL: psycopg 3 pool, which excludes persistent connections.
+    if env_bool('DJANGO_DB_POOL'):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', '10')),
+        }
+else:
+    # WAL mode is written into the database file, so the committed db.sqlite3
+    # keeps its journal mode; WAL is used only for a DJANGO_DB_NAME database.
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_PRAGMAS = [f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};', 'PRAGMA mmap_size=134217728;']
+    if os.environ.get('DJANGO_DB_NAME'):
+        SQLITE_PRAGMAS[:0] = ['PRAGMA journal_mode=WAL;', 'PRAGMA synchronous=NORMAL;']
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ''.join(SQLITE_PRAGMAS),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -1,37 +1,193 @@
 from django import forms
-from .models import Player, Match, StaffMember
-from django.forms import ModelForm, modelformset_factory
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.urls import reverse
+from .models import Player, Match, StaffMember, Statistics, STAFF_ROLES, validate_lineup
+from django.forms import ModelForm, BaseModelFormSet, modelformset_factory
+
+class LoadedChoicesMixin:
+    """Renders only the currently selected players; the rest of the squad is
+    loaded page by page from the lineup endpoint, so rendering the form never
+    iterates the whole player table."""
+
+    def get_context(self, name, value, attrs):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        ids = [str(v) for v in values if v is not None and str(v).isdigit()]
+        players = Player.objects.filter(pk__in=ids).order_by('broj_dresa', 'prezime') if ids else []
+        self.choices = [(str(player.pk), player_label(player)) for player in players]
+        context = super().get_context(name, value, attrs)
+        context['widget']['source_url'] = reverse('main:lineup-players')
+        return context
+
+
+class LineupSelect(LoadedChoicesMixin, forms.SelectMultiple):
+    template_name = 'main/widgets/lineup_select.html'
+
+
+class CaptainSelect(LoadedChoicesMixin, forms.Select):
+    pass
+
+
+def player_label(player):
+    return f"{player.broj_dresa}. {player.ime} {player.prezime}"
+
 
 class MatchForm(ModelForm):
+    kategorija = forms.ChoiceField(choices=Player.CATEGORY_CHOICES, label="Kategorija")
     igraci = forms.ModelMultipleChoiceField(
         queryset=Player.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=LineupSelect,
         label="Igrači (min 11, max 18)"
     )
     kapetan = forms.ModelChoiceField(
         queryset=Player.objects.all(),
-        widget=forms.RadioSelect,
+        widget=CaptainSelect,
         label="Kapetan"
     )
-    trener = forms.ModelChoiceField(queryset=StaffMember.objects.all(), label="Trener")
-    fizioterapeut = forms.ModelChoiceField(queryset=StaffMember.objects.all(), label="Fizioterapeut")
-    predstavnik = forms.ModelChoiceField(queryset=StaffMember.objects.all(), label="Predstavnik kluba")
 
     class Meta:
         model = Match
-        fields = ['datum', 'protivnik', 'lokacija', 'rezultat', 'opis', 'igraci', 'kapetan', 'trener', 'fizioterapeut', 'predstavnik']
+        fields = ['datum', 'protivnik', 'lokacija', 'golovi_za', 'golovi_protiv', 'opis', 'kategorija', 'igraci', 'kapetan',
+                  'trener', 'fizioterapeut', 'predstavnik_kluba']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and self.instance.kapetan_id:
+            self.initial.setdefault('kategorija', self.instance.kapetan.kategorija)
+        kategorija = self.data.get(self.add_prefix('kategorija')) if self.is_bound else None
+        if kategorija in dict(Player.CATEGORY_CHOICES):
+            squad = Player.objects.filter(kategorija=kategorija)
+            self.fields['igraci'].queryset = squad
+            self.fields['kapetan'].queryset = squad
+        for field, funkcija in STAFF_ROLES.items():
+            self.fields[field].queryset = StaffMember.objects.filter(funkcija=funkcija)
 
     def clean(self):
         cleaned_data = super().clean()
-        igraci = cleaned_data.get('igraci')
-        kapetan = cleaned_data.get('kapetan')
+        if 'igraci' in cleaned_data:
+            try:
+                validate_lineup(cleaned_data['igraci'], cleaned_data.get('kapetan'))
+            except ValidationError as error:
+                self.add_error(None, error)
+        golovi_za, golovi_protiv = cleaned_data.get('golovi_za'), cleaned_data.get('golovi_protiv')
+        if (golovi_za is None) != (golovi_protiv is None):
+            missing = 'golovi_za' if golovi_za is None else 'golovi_protiv'
+            if missing not in self.errors:
+                self.add_error(missing, 'Unesite golove obiju momčadi ili ostavite rezultat prazan.')
+        elif golovi_za is None:
+            # Obrisani rezultat ne smije se ponovno pročitati iz starog teksta.
+            self.instance.rezultat = ''
+        return cleaned_data
 
-        if igraci:
-            if len(igraci) < 11:
-                self.add_error('igraci', 'Potrebno je odabrati najmanje 11 igrača.')
-            if len(igraci) > 18:
-                self.add_error('igraci', 'Možete odabrati najviše 18 igrača.')
-            if kapetan and kapetan not in igraci:
-                self.add_error('kapetan', 'Kapetan mora biti među odabranim igračima.')
+    @transaction.atomic
+    def save(self, commit=True):
+        # Lineup rows are the Statistics through model; RelatedManager.set()
+        # in _save_m2m deletes and bulk-inserts only the difference.
+        return super().save(commit)
 
+
+class StatsFilterForm(forms.Form):
+    kategorija = forms.ChoiceField(
+        choices=[('', 'Sve kategorije')] + Player.CATEGORY_CHOICES,
+        required=False,
+        label="Kategorija"
+    )
+    od = forms.DateField(required=False, label="Od", widget=forms.DateInput(attrs={'type': 'date'}))
+    do = forms.DateField(required=False, label="Do", widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        od = cleaned_data.get('od')
+        do = cleaned_data.get('do')
+        if od and do and od > do:
+            self.add_error('do', 'Datum "do" mora biti nakon datuma "od".')
         return cleaned_data
+
+
+# Unos statistike za cijelu utakmicu
+STATISTICS_FIELDS = ['golovi', 'asistencije', 'minute', 'zuti_kartoni', 'crveni_kartoni']
+
+
+class LoadedRowField(forms.ModelChoiceField):
+    """Resolves a submitted row id against rows the formset already loaded,
+    instead of issuing a lookup query per row."""
+
+    def __init__(self, rows, **kwargs):
+        self.rows = rows
+        super().__init__(queryset=Statistics.objects.none(), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.rows[int(value)]
+        except (KeyError, ValueError, TypeError):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class StatisticsRowForm(ModelForm):
+    class Meta:
+        model = Statistics
+        fields = STATISTICS_FIELDS
+        widgets = {
+            field: forms.NumberInput(attrs={'class': 'form-control form-control-sm', 'min': 0})
+            for field in STATISTICS_FIELDS
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field in STATISTICS_FIELDS:
+            if (cleaned_data.get(field) or 0) < 0:
+                self.add_error(field, 'Vrijednost ne može biti negativna.')
+        if (cleaned_data.get('minute') or 0) > 120:
+            self.add_error('minute', 'Igrač ne može odigrati više od 120 minuta.')
+        if (cleaned_data.get('zuti_kartoni') or 0) > 2:
+            self.add_error('zuti_kartoni', 'Igrač može dobiti najviše 2 žuta kartona.')
+        if (cleaned_data.get('crveni_kartoni') or 0) > 1:
+            self.add_error('crveni_kartoni', 'Igrač može dobiti najviše 1 crveni karton.')
+        return cleaned_data
+
+
+class BaseStatisticsFormSet(BaseModelFormSet):
+    """Statistics grid of one match: one row per player in the lineup.
+
+    The grid only edits the lineup's existing rows. The form counts come from
+    the loaded rows rather than the posted management form, so a tampered
+    TOTAL_FORMS or INITIAL_FORMS cannot add rows without a player or match.
+    """
+
+    def initial_form_count(self):
+        return len(self._existing_object_dict())
+
+    def total_form_count(self):
+        return self.initial_form_count()
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        field = form.fields[self._pk_field.name]
+        form.fields[self._pk_field.name] = LoadedRowField(
+            self._existing_object_dict(), initial=field.initial, widget=field.widget
+        )
+
+    def _existing_object_dict(self):
+        if not hasattr(self, '_object_dict'):
+            self._object_dict = {row.pk: row for row in self.get_queryset()}
+        return self._object_dict
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+        rows = [form.cleaned_data for form in self.forms]
+        if sum(row.get('asistencije', 0) for row in rows) > sum(row.get('golovi', 0) for row in rows):
+            raise ValidationError('Ukupan broj asistencija ne može biti veći od ukupnog broja golova.')
+
+    def save(self, commit=True):
+        rows = [form.instance for form in self.forms if form.has_changed()]
+        Statistics.objects.bulk_update(rows, STATISTICS_FIELDS)
+        return rows
+
+
+StatisticsFormSet = modelformset_factory(
+    Statistics, form=StatisticsRowForm, formset=BaseStatisticsFormSet, extra=0, edit_only=True
+)
@@ -0,0 +1,102 @@
+from django.core.cache import cache
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+
+from .models import CacheVersion, Match, Statistics
+
+STATISTICS_VERSION = 'statistics'
+LEADERBOARD_TIMEOUT = 60 * 60
+LEADERBOARD_SIZE = 10
+# Igrači s manje odigranih minuta ne ulaze u poredak golova po 90 minuta.
+MIN_MINUTES_PER_90 = 270
+
+
+def statistics_version():
+    return CacheVersion.objects.filter(naziv=STATISTICS_VERSION).values_list('verzija', flat=True).first() or 0
+
+
+def bump_statistics_version():
+    """Invalidate all cached leaderboards after Statistics, Player or Match writes.
+
+    The version lives in the database, so a write in one worker retires the
+    leaderboards cached by every other worker as well.
+    """
+    if not CacheVersion.objects.filter(naziv=STATISTICS_VERSION).update(verzija=F('verzija') + 1):
+        CacheVersion.objects.get_or_create(naziv=STATISTICS_VERSION, defaults={'verzija': 1})
+
+
+def player_totals(kategorija=None, od=None, do=None):
+    """Season totals per player from a single grouped query over Statistics."""
+    stats = Statistics.objects.all()
+    if kategorija:
+        stats = stats.filter(igrac__kategorija=kategorija)
+    if od:
+        stats = stats.filter(utakmica__datum__gte=od)
+    if do:
+        stats = stats.filter(utakmica__datum__lte=do)
+    return list(
+        stats.values('igrac')
+        .annotate(
+            ime=F('igrac__ime'),
+            prezime=F('igrac__prezime'),
+            kategorija=F('igrac__kategorija'),
+            utakmice=Count('utakmica'),
+            golovi=Sum('golovi'),
+            asistencije=Sum('asistencije'),
+            minute=Sum('minute'),
+            zuti=Sum('zuti_kartoni'),
+            crveni=Sum('crveni_kartoni'),
+        )
+        .order_by()
+    )
+
+
+def club_summary(kategorija=None, od=None, do=None):
+    """Wins, draws, losses and goals of the club from one aggregate query."""
+    matches = Match.objects.exclude(ishod='')
+    if kategorija:
+        matches = matches.filter(
+            Exists(Statistics.objects.filter(utakmica=OuterRef('pk'), igrac__kategorija=kategorija))
+        )
+    if od:
+        matches = matches.filter(datum__gte=od)
+    if do:
+        matches = matches.filter(datum__lte=do)
+    summary = matches.aggregate(
+        utakmice=Count('pk'),
+        pobjede=Count('pk', filter=Q(ishod='P')),
+        nerijeseno=Count('pk', filter=Q(ishod='N')),
+        porazi=Count('pk', filter=Q(ishod='I')),
+        golovi_za=Sum('golovi_za', default=0),
+        golovi_protiv=Sum('golovi_protiv', default=0),
+    )
+    summary['gol_razlika'] = summary['golovi_za'] - summary['golovi_protiv']
+    summary['bodovi'] = 3 * summary['pobjede'] + summary['nerijeseno']
+    return summary
+
+
+def top(rows, key, predicate=None):
+    # Descending by key, ties by surname A-Z: the second sort is stable.
+    rows = sorted((row for row in rows if (predicate(row) if predicate else key(row))), key=lambda row: row['prezime'])
+    return sorted(rows, key=key, reverse=True)[:LEADERBOARD_SIZE]
+
+
+def season_leaderboards(kategorija=None, od=None, do=None):
+    """All leaderboards for the given filters, cached until the next stats write."""
+    key = f'leaderboards:{statistics_version()}:{kategorija or ""}:{od or ""}:{do or ""}'
+    boards = cache.get(key)
+    if boards is None:
+        rows = player_totals(kategorija, od, do)
+        for row in rows:
+            row['golovi_po_90'] = round(row['golovi'] * 90 / row['minute'], 2) if row['minute'] else 0
+        boards = {
+            'klub': club_summary(kategorija, od, do),
+            'strijelci': top(rows, lambda row: row['golovi']),
+            'asistenti': top(rows, lambda row: row['asistencije']),
+            'minute': top(rows, lambda row: row['minute']),
+            'golovi_po_90': top(rows, lambda row: row['golovi_po_90'],
+                                lambda row: row['golovi'] and row['minute'] >= MIN_MINUTES_PER_90),
+            'disciplina': top(rows, lambda row: (row['crveni'], row['zuti']),
+                              lambda row: row['crveni'] or row['zuti']),
+        }
+        cache.set(key, boards, LEADERBOARD_TIMEOUT)
+    return boards
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='match',
+            name='datum',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='datum',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['naziv'], name='equipment_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['kategorija', 'naziv'], name='equipment_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['prezime', 'ime'], name='player_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['kategorija', 'prezime', 'ime'], name='player_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffmember',
+            index=models.Index(fields=['ime'], name='staff_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffmember',
+            index=models.Index(fields=['funkcija', 'ime'], name='staff_role_name_idx'),
+        ),
+    ]
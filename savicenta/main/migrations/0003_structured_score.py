@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:19
+
+import re
+
+from django.db import migrations, models
+
+# "3:1", "3-1", "3 : 1" - prvi broj su golovi kluba.
+REZULTAT = re.compile(r'^\s*(\d+)\s*[:\-]\s*(\d+)\s*$')
+
+
+def parse_rezultat(apps, schema_editor):
+    Match = apps.get_model('main', 'Match')
+    matches = []
+    for match in Match.objects.only('pk', 'rezultat').iterator(chunk_size=1000):
+        parsed = REZULTAT.match(match.rezultat or '')
+        if not parsed:
+            continue
+        match.golovi_za, match.golovi_protiv = int(parsed.group(1)), int(parsed.group(2))
+        if match.golovi_za > match.golovi_protiv:
+            match.ishod = 'P'
+        else:
+            match.ishod = 'N' if match.golovi_za == match.golovi_protiv else 'I'
+        matches.append(match)
+    Match.objects.bulk_update(matches, ['golovi_za', 'golovi_protiv', 'ishod'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='golovi_protiv',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Golovi protiv'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='golovi_za',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Golovi za'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='ishod',
+            field=models.CharField(blank=True, choices=[('P', 'Pobjeda'), ('N', 'Neriješeno'), ('I', 'Poraz')], editable=False, max_length=1),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='rezultat',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['ishod', 'datum'], name='match_outcome_date_idx'),
+        ),
+        migrations.RunPython(parse_rezultat, migrations.RunPython.noop),
+    ]
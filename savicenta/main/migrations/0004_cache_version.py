@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_structured_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('naziv', models.CharField(max_length=50, unique=True)),
+                ('verzija', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
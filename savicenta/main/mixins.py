@@ -0,0 +1,126 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class CursorPage:
+    def __init__(self, object_list, query, cursor_param, next_cursor=None, is_first=True):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+        self._query = query
+        self._cursor_param = cursor_param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return not self.is_first
+
+    def next_query(self):
+        query = self._query.copy()
+        query[self._cursor_param] = self.next_cursor
+        return query.urlencode()
+
+    def first_query(self):
+        query = self._query.copy()
+        query.pop(self._cursor_param, None)
+        return query.urlencode()
+
+
+class ListPageMixin:
+    """Filterable ListView with keyset (cursor) pagination.
+
+    A page is addressed by the ordering values of the last row shown, so every
+    page is a single indexed range scan no matter how deep it is. ``ordering``
+    must name non-null model fields and end with ``pk``.
+    """
+    paginate_by = 25
+    ordering = ('pk',)
+    select_related = ()
+    prefetch_related = ()
+    search_fields = ()
+    filter_fields = ()
+    cursor_param = 'cursor'
+    search_param = 'q'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        filters = {field: self.request.GET[field] for field in self.filter_fields if self.request.GET.get(field)}
+        if filters:
+            queryset = queryset.filter(**filters)
+        search = self.request.GET.get(self.search_param, '').strip()
+        if search and self.search_fields:
+            queryset = queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': search}) for field in self.search_fields)))
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = list(self.get_ordering())
+        cursor = self.request.GET.get(self.cursor_param)
+        if cursor:
+            queryset = queryset.filter(self.after_cursor(ordering, self.decode_cursor(ordering, cursor)))
+        rows = list(queryset[:page_size + 1])
+        next_cursor = self.encode_cursor(ordering, rows[page_size - 1]) if len(rows) > page_size else None
+        page = CursorPage(rows[:page_size], self.request.GET, self.cursor_param, next_cursor, is_first=not cursor)
+        return None, page, page.object_list, page.has_next() or page.has_previous()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        opts = self.model._meta
+        context['search_param'] = self.search_param if self.search_fields else None
+        context['search_value'] = self.request.GET.get(self.search_param, '')
+        context['list_filters'] = [
+            {
+                'name': field,
+                'label': opts.get_field(field).verbose_name,
+                'choices': opts.get_field(field).choices,
+                'value': self.request.GET.get(field, ''),
+            }
+            for field in self.filter_fields
+        ]
+        return context
+
+    @staticmethod
+    def after_cursor(ordering, values):
+        # (a, b, pk) > (x, y, z) expanded per column, honouring each direction.
+        conditions = []
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): values[j] for j, f in enumerate(ordering[:i])}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[i]}))
+        return reduce(or_, conditions)
+
+    def ordering_field(self, field):
+        name = field.lstrip('-')
+        opts = self.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, ordering, obj):
+        values = [getattr(obj, self.ordering_field(field).attname) for field in ordering]
+        return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+    def decode_cursor(self, ordering, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(ordering):
+                raise ValueError
+            return [
+                self.ordering_field(field).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise Http404("Neispravna stranica.")
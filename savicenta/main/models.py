@@ -1,6 +1,46 @@
+import re
+from collections import Counter
+
 from django.db import models
 from django.core.exceptions import ValidationError
 
+MIN_PLAYERS = 11
+MAX_PLAYERS = 18
+# Polje utakmice -> funkcija koju član stožera mora imati.
+STAFF_ROLES = {
+    'trener': 'trener',
+    'fizioterapeut': 'fizioterapeut',
+    'predstavnik_kluba': 'predstavnik',
+}
+
+
+def validate_lineup(players=None, captain=None, staff=None):
+    """Validate a match lineup that is already held in memory.
+
+    ``players`` are the selected Player objects (None skips the lineup checks)
+    and ``staff`` maps Match staff fields to the assigned StaffMember. No
+    queries are issued; errors are raised keyed by field name.
+    """
+    errors = {}
+    if players is not None:
+        players = list(players)
+        if len(players) < MIN_PLAYERS:
+            errors.setdefault('igraci', []).append(f'Potrebno je odabrati najmanje {MIN_PLAYERS} igrača.')
+        if len(players) > MAX_PLAYERS:
+            errors.setdefault('igraci', []).append(f'Možete odabrati najviše {MAX_PLAYERS} igrača.')
+        duplicates = sorted(number for number, count in Counter(p.broj_dresa for p in players).items() if count > 1)
+        if duplicates:
+            errors.setdefault('igraci', []).append(
+                'Više igrača nosi isti broj dresa: ' + ', '.join(str(number) for number in duplicates) + '.'
+            )
+        if captain is not None and captain.pk not in {p.pk for p in players}:
+            errors.setdefault('kapetan', []).append('Kapetan mora biti među odabranim igračima.')
+    for field, member in (staff or {}).items():
+        if member is not None and member.funkcija != STAFF_ROLES[field]:
+            errors.setdefault(field, []).append(f'{member.ime} nema funkciju {STAFF_ROLES[field]}.')
+    if errors:
+        raise ValidationError(errors)
+
 class Player(models.Model):
     POSITION_CHOICES = [
         ('GK', 'Golman'),
@@ -21,6 +61,12 @@ class Player(models.Model):
     broj_dresa = models.IntegerField()
     kategorija = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['prezime', 'ime'], name='player_name_idx'),
+            models.Index(fields=['kategorija', 'prezime', 'ime'], name='player_category_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.ime} {self.prezime}"
 
@@ -34,14 +80,40 @@ class StaffMember(models.Model):
     funkcija = models.CharField(max_length=50, choices=FUNKCIJE)
     kontakt = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['ime'], name='staff_name_idx'),
+            models.Index(fields=['funkcija', 'ime'], name='staff_role_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.funkcija.title()}: {self.ime}"
 
+# "3:1", "3-1", "3 : 1" - prvi broj su golovi kluba.
+REZULTAT = re.compile(r'^\s*(\d+)\s*[:\-]\s*(\d+)\s*$')
+
+
+def ishod_utakmice(golovi_za, golovi_protiv):
+    if golovi_za is None or golovi_protiv is None:
+        return ''
+    if golovi_za > golovi_protiv:
+        return 'P'
+    return 'N' if golovi_za == golovi_protiv else 'I'
+
+
 class Match(models.Model):
-    datum = models.DateField()
+    ISHOD_CHOICES = [
+        ('P', 'Pobjeda'),
+        ('N', 'Neriješeno'),
+        ('I', 'Poraz'),
+    ]
+    datum = models.DateField(db_index=True)
     protivnik = models.CharField(max_length=100)
     lokacija = models.CharField(max_length=100)
-    rezultat = models.CharField(max_length=20)
+    rezultat = models.CharField(max_length=20, blank=True)
+    golovi_za = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Golovi za")
+    golovi_protiv = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Golovi protiv")
+    ishod = models.CharField(max_length=1, choices=ISHOD_CHOICES, blank=True, editable=False)
     opis = models.TextField(blank=True)
     igraci = models.ManyToManyField(Player, through='Statistics')
     kapetan = models.ForeignKey(Player, related_name='kapetan_utakmice', on_delete=models.SET_NULL, null=True)
@@ -56,9 +128,27 @@ class Match(models.Model):
         verbose_name="Predstavnik kluba"
 )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['ishod', 'datum'], name='match_outcome_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Rezultat i ishod izvode se iz golova, tekst ostaje za prikaz.
+        parsed = REZULTAT.match(self.rezultat or '')
+        if parsed and self.golovi_za is None and self.golovi_protiv is None:
+            self.golovi_za, self.golovi_protiv = int(parsed.group(1)), int(parsed.group(2))
+        self.ishod = ishod_utakmice(self.golovi_za, self.golovi_protiv)
+        if self.ishod:
+            self.rezultat = f"{self.golovi_za}:{self.golovi_protiv}"
+        elif self.golovi_za is not None or self.golovi_protiv is not None:
+            # Nepotpun rezultat: stari tekst više ne odgovara golovima.
+            self.rezultat = ''
+        super().save(*args, **kwargs)
+
     def clean(self):
-        if self.kapetan and not Statistics.objects.filter(utakmica=self, igrac=self.kapetan).exists():
-            raise ValidationError("Kapetan mora biti među odabranim igračima za utakmicu.")
+        # Sastav se provjerava u MatchForm, zajedno s odabranim igračima.
+        validate_lineup(staff={field: getattr(self, field) for field in STAFF_ROLES})
 
     def __str__(self):
         return f"{self.datum} - {self.protivnik}"
@@ -76,7 +166,7 @@ class Statistics(models.Model):
         unique_together = ('igrac', 'utakmica')
 
 class Meeting(models.Model):
-    datum = models.DateField()
+    datum = models.DateField(db_index=True)
     zapisnik = models.TextField()
     prisutni = models.ManyToManyField(StaffMember)
 
@@ -85,3 +175,18 @@ class Equipment(models.Model):
     kolicina = models.IntegerField()
     stanje = models.CharField(max_length=100)
     kategorija = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['naziv'], name='equipment_name_idx'),
+            models.Index(fields=['kategorija', 'naziv'], name='equipment_category_name_idx'),
+        ]
+
+class CacheVersion(models.Model):
+    # Brojač za ključeve predmemorije čuva se u bazi: svaki proces ima svoju
+    # LocMem predmemoriju, a bazu vide svi.
+    naziv = models.CharField(max_length=50, unique=True)
+    verzija = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.naziv}: {self.verzija}"
@@ -0,0 +1,16 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .leaderboards import bump_statistics_version
+from .models import Match, Player, Statistics
+
+
+@receiver(post_save, sender=Statistics)
+@receiver(post_delete, sender=Statistics)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+@receiver(m2m_changed, sender=Match.igraci.through)
+def invalidate_leaderboards(sender, **kwargs):
+    bump_statistics_version()
@@ -1,3 +1,329 @@
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .forms import MatchForm
+from .leaderboards import bump_statistics_version, club_summary, season_leaderboards
+from .mixins import ListPageMixin
+from .models import Match, Player, StaffMember, Statistics, validate_lineup
+from .views import LineupPlayersView, PlayerDetailView
+
+
+def make_player(broj_dresa, prezime='Horvat', kategorija='seniori', **fields):
+    return Player.objects.create(ime=f'Igrač{broj_dresa}', prezime=prezime, datum_rodenja=date(2000, 1, 1),
+                                 pozicija='MF', broj_dresa=broj_dresa, kategorija=kategorija, **fields)
+
+
+def make_match(day, **fields):
+    return Match.objects.create(datum=day, protivnik='NK Opatija', lokacija='Kastav', **fields)
+
+
+class PlayerMatchLogTests(TestCase):
+    def setUp(self):
+        self.player = make_player(9)
+        for day, golovi, asistencije in [(1, 2, 0), (8, 0, 1), (15, 1, 1)]:
+            Statistics.objects.create(igrac=self.player, utakmica=make_match(date(2024, 3, day)),
+                                      golovi=golovi, asistencije=asistencije, minute=90, zuti_kartoni=1)
+
+    def get_log(self, page=1):
+        url = reverse('main:player-detail', args=[self.player.pk])
+        response = self.client.get(url, {'page': page})
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_running_and_career_totals(self):
+        context = self.get_log()
+        self.assertEqual([row.utakmica.datum.day for row in context['stats']], [15, 8, 1])
+        self.assertEqual([row.golovi_do_sada for row in context['stats']], [3, 2, 2])
+        self.assertEqual([row.asistencije_do_sada for row in context['stats']], [2, 1, 0])
+        self.assertEqual(context['total_stats'], {
+            'ukupno_golova': 3, 'ukupno_asistencija': 2, 'ukupno_zuti': 3, 'ukupno_crveni': 0,
+            'ukupno_minute': 270, 'ukupno_utakmica': 3,
+        })
+
+    def test_totals_cover_all_pages(self):
+        with mock.patch.object(PlayerDetailView, 'match_log_paginate_by', 2):
+            context = self.get_log(page=2)
+        self.assertEqual([row.utakmica.datum.day for row in context['stats']], [1])
+        self.assertEqual(context['stats'][0].golovi_do_sada, 2)
+        self.assertEqual(context['total_stats']['ukupno_golova'], 3)
+        self.assertTrue(context['is_paginated'])
+
+    def test_player_without_matches(self):
+        self.player = make_player(10)
+        context = self.get_log()
+        self.assertEqual(context['stats'], [])
+        self.assertEqual(context['total_stats']['ukupno_utakmica'], 0)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        match = make_match(date(2024, 3, 1))
+        other = make_match(date(2024, 4, 1))
+        self.rows = {}
+        for broj_dresa, prezime, kategorija, golovi, minute in [
+            (9, 'Anić', 'seniori', 2, 90), (10, 'Zorić', 'seniori', 2, 300), (11, 'Babić', 'seniori', 1, 90),
+            (7, 'Kovač', 'juniori', 3, 90),
+        ]:
+            player = make_player(broj_dresa, prezime, kategorija)
+            self.rows[prezime] = Statistics.objects.create(igrac=player, utakmica=match, golovi=golovi, minute=minute)
+        Statistics.objects.create(igrac=self.rows['Babić'].igrac, utakmica=other, zuti_kartoni=1)
+
+    def names(self, board):
+        return [row['prezime'] for row in board]
+
+    def test_ties_are_ordered_by_surname(self):
+        boards = season_leaderboards(kategorija='seniori')
+        self.assertEqual(self.names(boards['strijelci']), ['Anić', 'Zorić', 'Babić'])
+        self.assertEqual(self.names(boards['disciplina']), ['Babić'])
+        self.assertEqual(self.names(boards['golovi_po_90']), ['Zorić'])
+
+    def test_filters(self):
+        self.assertEqual(self.names(season_leaderboards()['strijelci'])[0], 'Kovač')
+        self.assertEqual(self.names(season_leaderboards(kategorija='juniori')['strijelci']), ['Kovač'])
+        self.assertEqual(self.names(season_leaderboards(od=date(2024, 4, 1))['disciplina']), ['Babić'])
+        self.assertEqual(season_leaderboards(od=date(2024, 4, 1))['strijelci'], [])
+
+    def test_statistics_write_invalidates_cache(self):
+        self.assertEqual(self.names(season_leaderboards(kategorija='seniori')['strijelci'])[0], 'Anić')
+        # Pogodak u predmemoriji stoji samo čitanje verzije.
+        with self.assertNumQueries(1):
+            season_leaderboards(kategorija='seniori')
+        self.rows['Babić'].golovi = 5
+        self.rows['Babić'].save()
+        self.assertEqual(self.names(season_leaderboards(kategorija='seniori')['strijelci'])[0], 'Babić')
+
+    def test_write_in_another_worker_invalidates_cache(self):
+        # Drugi proces ima svoju LocMem predmemoriju; upis u ovom procesu je ne dira.
+        other_worker = LocMemCache('other-worker', {})
+        with mock.patch('main.leaderboards.cache', other_worker):
+            self.assertEqual(self.names(season_leaderboards(kategorija='seniori')['strijelci'])[0], 'Anić')
+        Statistics.objects.filter(pk=self.rows['Babić'].pk).update(golovi=5)
+        bump_statistics_version()
+        with mock.patch('main.leaderboards.cache', other_worker):
+            self.assertEqual(self.names(season_leaderboards(kategorija='seniori')['strijelci'])[0], 'Babić')
+
+
+class MatchStatisticsGridTests(TestCase):
+    def setUp(self):
+        self.match = make_match(date(2024, 3, 1))
+        self.rows = [
+            Statistics.objects.create(igrac=make_player(number, prezime), utakmica=self.match)
+            for number, prezime in [(9, 'Anić'), (10, 'Babić')]
+        ]
+        self.url = reverse('main:match-statistics', args=[self.match.pk])
+
+    def grid_data(self, total=2, **changes):
+        data = {'form-TOTAL_FORMS': total, 'form-INITIAL_FORMS': 2, 'form-MIN_NUM_FORMS': 0, 'form-MAX_NUM_FORMS': 1000}
+        for index, row in enumerate(self.rows):
+            data[f'form-{index}-id'] = row.pk
+            for field in ('golovi', 'asistencije', 'minute', 'zuti_kartoni', 'crveni_kartoni'):
+                data[f'form-{index}-{field}'] = 0
+        data.update(changes)
+        return data
+
+    def test_get_lists_lineup(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['formset'].forms), 2)
+
+    def test_saves_all_rows(self):
+        data = self.grid_data(**{'form-0-golovi': 2, 'form-0-minute': 90, 'form-1-asistencije': 1})
+        # Utakmica, retci statistike, jedan bulk_update i pomak verzije ljestvica.
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url, data)
+        self.assertRedirects(response, reverse('main:match-detail', args=[self.match.pk]))
+        self.assertEqual(
+            list(Statistics.objects.order_by('igrac__prezime').values_list('golovi', 'asistencije', 'minute')),
+            [(2, 0, 90), (0, 1, 0)],
+        )
+
+    def test_rejects_invalid_grid(self):
+        response = self.client.post(self.url, self.grid_data(**{'form-1-asistencije': 1}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['formset'].non_form_errors())
+        self.assertFalse(Statistics.objects.filter(asistencije__gt=0).exists())
+
+    def test_tampered_form_count_adds_no_rows(self):
+        data = self.grid_data(total=3, **{'form-0-golovi': 1, 'form-2-golovi': 4, 'form-2-minute': 90})
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Statistics.objects.count(), 2)
+        self.assertEqual(Statistics.objects.filter(golovi__gt=0).count(), 1)
+
+    def test_missing_row_id_is_rejected(self):
+        data = self.grid_data(**{'form-1-golovi': 1})
+        del data['form-1-id']
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Statistics.objects.filter(golovi__gt=0).exists())
+
+
+class LineupSelectorTests(TestCase):
+    def setUp(self):
+        self.seniors = [make_player(number, f'Senior{number:02d}') for number in range(1, 13)]
+        self.junior = make_player(5, 'Junior', 'juniori')
+
+    def test_endpoint_lists_one_category(self):
+        response = self.client.get(reverse('main:lineup-players'), {'kategorija': 'juniori'})
+        self.assertEqual(response.json()['results'], [
+            {'id': self.junior.pk, 'ime': 'Igrač5', 'prezime': 'Junior', 'broj_dresa': 5, 'pozicija': 'MF'},
+        ])
+
+    def test_endpoint_search_and_pages(self):
+        url = reverse('main:lineup-players')
+        data = self.client.get(url, {'kategorija': 'seniori', 'q': '12'}).json()
+        self.assertEqual([row['broj_dresa'] for row in data['results']], [12])
+        with mock.patch.object(LineupPlayersView, 'paginate_by', 5):
+            data = self.client.get(url, {'kategorija': 'seniori', 'page': 3}).json()
+        self.assertEqual([row['broj_dresa'] for row in data['results']], [11, 12])
+        self.assertFalse(data['has_next'])
+
+    def test_widget_renders_only_selected_players(self):
+        form = MatchForm(initial={'igraci': [self.seniors[0].pk], 'kapetan': self.seniors[0].pk})
+        html = str(form['igraci'])
+        self.assertIn('Senior01', html)
+        self.assertNotIn('Senior02', html)
+
+    def test_lineup_is_scoped_to_category(self):
+        players = self.seniors[:10] + [self.junior]
+        form = MatchForm(data={
+            'datum': '2024-03-01', 'protivnik': 'NK Opatija', 'lokacija': 'Kastav', 'kategorija': 'seniori',
+            'igraci': [player.pk for player in players], 'kapetan': self.seniors[0].pk,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('igraci', form.errors)
+
+
+class ValidateLineupTests(TestCase):
+    def setUp(self):
+        self.players = [make_player(number) for number in range(1, 13)]
+        self.trener = StaffMember.objects.create(ime='Ivo', funkcija='trener', kontakt='-')
+        self.fizio = StaffMember.objects.create(ime='Ana', funkcija='fizioterapeut', kontakt='-')
+
+    def errors(self, *args, **kwargs):
+        with self.assertNumQueries(0), self.assertRaises(ValidationError) as raised:
+            validate_lineup(*args, **kwargs)
+        return raised.exception.message_dict
+
+    def test_valid_lineup(self):
+        with self.assertNumQueries(0):
+            validate_lineup(self.players, self.players[0], {'trener': self.trener, 'fizioterapeut': self.fizio})
+
+    def test_player_count(self):
+        self.assertIn('igraci', self.errors(self.players[:10]))
+        extra = [make_player(number) for number in range(13, 20)]
+        self.assertIn('igraci', self.errors(self.players + extra))
+
+    def test_duplicate_jersey_numbers(self):
+        errors = self.errors(self.players + [make_player(7, 'Kovač')])
+        self.assertEqual(errors['igraci'], ['Više igrača nosi isti broj dresa: 7.'])
+
+    def test_captain_outside_lineup(self):
+        self.assertIn('kapetan', self.errors(self.players[:11], self.players[11]))
+
+    def test_staff_roles(self):
+        errors = self.errors(staff={'trener': self.fizio, 'predstavnik_kluba': self.trener})
+        self.assertEqual(set(errors), {'trener', 'predstavnik_kluba'})
+
+    def test_match_form_saves_lineup(self):
+        form = MatchForm(data={
+            'datum': '2024-03-01', 'protivnik': 'NK Opatija', 'lokacija': 'Kastav', 'kategorija': 'seniori',
+            'igraci': [player.pk for player in self.players[:11]], 'kapetan': self.players[0].pk,
+            'trener': self.trener.pk, 'fizioterapeut': self.fizio.pk,
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        with CaptureQueriesContext(connection) as queries:
+            match = form.save()
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "main_statistics"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Statistics.objects.filter(utakmica=match).count(), 11)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        for number, prezime in enumerate(['Anić', 'Babić', 'Babić', 'Cvitan', 'Dujmović'], start=1):
+            make_player(number, prezime, 'juniori' if number == 4 else 'seniori')
+        for day in (1, 1, 2):
+            make_match(date(2024, 3, day))
+        self.patch = mock.patch.object(ListPageMixin, 'paginate_by', 2)
+        self.patch.start()
+        self.addCleanup(self.patch.stop)
+
+    def walk(self, url, **params):
+        pages, cursor = [], None
+        while True:
+            response = self.client.get(url, {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page_obj']
+            pages.append(list(page.object_list))
+            if not page.has_next():
+                return pages
+            cursor = page.next_cursor
+
+    def test_pages_follow_ordering(self):
+        pages = self.walk(reverse('main:player-list'))
+        self.assertEqual([[player.broj_dresa for player in page] for page in pages], [[1, 2], [3, 4], [5]])
+
+    def test_descending_ordering_with_ties(self):
+        pages = self.walk(reverse('main:match-list'))
+        matches = [match for page in pages for match in page]
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(matches, list(Match.objects.order_by('-datum', '-pk')))
+
+    def test_filter_and_search(self):
+        pages = self.walk(reverse('main:player-list'), kategorija='seniori', q='bić')
+        self.assertEqual([[player.broj_dresa for player in page] for page in pages], [[2, 3]])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('main:player-list'), {'cursor': 'neispravno'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_each_page_is_one_query(self):
+        cursor = self.client.get(reverse('main:player-list')).context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('main:player-list'), {'cursor': cursor})
+        self.assertEqual(len([query for query in queries if 'FROM "main_player"' in query['sql']]), 1)
+
+
+class MatchScoreTests(TestCase):
+    def test_score_sets_result_and_outcome(self):
+        match = make_match(date(2024, 3, 1), golovi_za=3, golovi_protiv=1)
+        self.assertEqual((match.rezultat, match.ishod), ('3:1', 'P'))
+
+    def test_result_text_is_parsed(self):
+        match = make_match(date(2024, 3, 1), rezultat='2 - 2')
+        self.assertEqual((match.golovi_za, match.golovi_protiv, match.ishod), (2, 2, 'N'))
+
+    def test_partial_score_clears_result(self):
+        match = make_match(date(2024, 3, 1), golovi_za=0, golovi_protiv=1)
+        match.golovi_protiv = None
+        match.save()
+        match.refresh_from_db()
+        self.assertEqual((match.rezultat, match.ishod), ('', ''))
+
+    def test_form_rejects_partial_score(self):
+        form = MatchForm(data={'datum': '2024-03-01', 'protivnik': 'NK Opatija', 'lokacija': 'Kastav',
+                               'kategorija': 'seniori', 'golovi_za': 2})
+        self.assertFalse(form.is_valid())
+        self.assertIn('golovi_protiv', form.errors)
+        self.assertNotIn('golovi_za', form.errors)
 
-# Create your tests here.
+    def test_club_summary(self):
+        for golovi_za, golovi_protiv in [(3, 1), (1, 1), (0, 2)]:
+            make_match(date(2024, 3, 1), golovi_za=golovi_za, golovi_protiv=golovi_protiv)
+        make_match(date(2024, 3, 2))
+        with self.assertNumQueries(1):
+            summary = club_summary()
+        self.assertEqual(summary, {
+            'utakmice': 3, 'pobjede': 1, 'nerijeseno': 1, 'porazi': 1,
+            'golovi_za': 4, 'golovi_protiv': 4, 'gol_razlika': 0, 'bodovi': 4,
+        })
@@ -9,6 +9,7 @@ urlpatterns = [
     # Player
     path('igraci/', views.PlayerListView.as_view(), name='player-list'),
     path('igraci/<int:pk>/', views.PlayerDetailView.as_view(), name='player-detail'),
+    path('igraci/sastav/', views.LineupPlayersView.as_view(), name='lineup-players'),
     path('igraci/dodaj/', views.PlayerCreateView.as_view(), name='player-create'),
     path('igraci/<int:pk>/uredi/', views.PlayerUpdateView.as_view(), name='player-update'),
     path('igraci/<int:pk>/obrisi/', views.PlayerDeleteView.as_view(), name='player-delete'),
@@ -19,6 +20,10 @@ urlpatterns = [
     path('utakmice/dodaj/', views.MatchCreateView.as_view(), name='match-create'),
     path('utakmice/<int:pk>/uredi/', views.MatchUpdateView.as_view(), name='match-update'),
     path('utakmice/<int:pk>/obrisi/', views.MatchDeleteView.as_view(), name='match-delete'),
+    path('utakmice/<int:pk>/statistika/', views.MatchStatisticsView.as_view(), name='match-statistics'),
+
+    # Statistics
+    path('statistika/', views.StatsDashboardView.as_view(), name='stats-dashboard'),
 
     # Staff
     path('uprava/', views.StaffListView.as_view(), name='staff-list'),
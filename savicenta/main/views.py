@@ -1,10 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, View
+from django.http import JsonResponse
 from django.urls import reverse_lazy
 from .models import Player, Match, Statistics, StaffMember, Meeting, Equipment
-from django.forms import ModelForm, ModelMultipleChoiceField, CheckboxSelectMultiple, ValidationError
-from django import forms
-from django.db.models import Sum
+from .forms import MatchForm, StatsFilterForm, StatisticsFormSet
+from .mixins import ListPageMixin
+from .leaderboards import bump_statistics_version, season_leaderboards
+from django.core.paginator import Paginator
+from django.db.models import Count, F, Q, RowRange, Sum, Window
 
 # INDEX
 
@@ -12,27 +15,53 @@ def index(request):
     return render(request, 'main/index.html')
 
 # PLAYER
-class PlayerListView(ListView):
+class PlayerListView(ListPageMixin, ListView):
     model = Player
     template_name = 'main/players/player_list.html'
+    ordering = ('prezime', 'ime', 'pk')
+    search_fields = ('ime', 'prezime')
+    filter_fields = ('kategorija', 'pozicija')
 
 class PlayerDetailView(DetailView):
     model = Player
     template_name = 'main/players/player_detail.html'
+    match_log_paginate_by = 20
+
+    def get_match_log(self):
+        """Per-match statistics with running and career totals from one query.
+
+        The window sums are evaluated over all of the player's rows before the
+        page is sliced off, so every page carries correct totals.
+        """
+        chronological = [F('utakmica__datum').asc(), F('pk').asc()]
+        running = {'order_by': chronological, 'frame': RowRange(start=None, end=0)}
+        return (
+            Statistics.objects.filter(igrac=self.object)
+            .select_related('utakmica')
+            .annotate(
+                golovi_do_sada=Window(Sum('golovi'), **running),
+                asistencije_do_sada=Window(Sum('asistencije'), **running),
+                minute_do_sada=Window(Sum('minute'), **running),
+                ukupno_golova=Window(Sum('golovi')),
+                ukupno_asistencija=Window(Sum('asistencije')),
+                ukupno_zuti=Window(Sum('zuti_kartoni')),
+                ukupno_crveni=Window(Sum('crveni_kartoni')),
+                ukupno_minute=Window(Sum('minute')),
+                ukupno_utakmica=Window(Count('pk')),
+            )
+            .order_by('-utakmica__datum', '-pk')
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        player = self.object
-        stats = Statistics.objects.filter(igrac=player).select_related('utakmica')
-        total_stats = stats.aggregate(
-            ukupno_golova=Sum('golovi'),
-            ukupno_asistencija=Sum('asistencije'),
-            ukupno_zuti=Sum('zuti_kartoni'),
-            ukupno_crveni=Sum('crveni_kartoni'),
-            ukupno_minute=Sum('minute')
-        )
+        paginator = Paginator(self.get_match_log(), self.match_log_paginate_by)
+        page_obj = paginator.get_page(self.request.GET.get('page'))
+        stats = list(page_obj.object_list)
+        totals = ['ukupno_golova', 'ukupno_asistencija', 'ukupno_zuti', 'ukupno_crveni', 'ukupno_minute', 'ukupno_utakmica']
         context['stats'] = stats
-        context['total_stats'] = total_stats
+        context['total_stats'] = {key: getattr(stats[0], key) if stats else 0 for key in totals}
+        context['page_obj'] = page_obj
+        context['is_paginated'] = page_obj.has_other_pages()
         return context
 
 class PlayerCreateView(CreateView):
@@ -52,36 +81,33 @@ class PlayerDeleteView(DeleteView):
     template_name = 'main/players/player_confirm_delete.html'
     success_url = reverse_lazy('main:player-list')
 
-# MATCH FORM
-class MatchForm(ModelForm):
-    igraci = ModelMultipleChoiceField(
-        queryset=Player.objects.all(),
-        widget=CheckboxSelectMultiple,
-        required=True
-    )
-    kapetan = forms.ModelChoiceField(queryset=Player.objects.all(), required=True)
-
-    class Meta:
-        model = Match
-        fields = ['datum', 'protivnik', 'lokacija', 'rezultat', 'opis', 'trener', 'fizioterapeut', 'predstavnik_kluba', 'igraci', 'kapetan']
-
-    def clean(self):
-        cleaned_data = super().clean()
-        igraci = cleaned_data.get('igraci')
-        kapetan = cleaned_data.get('kapetan')
-        if igraci:
-            if len(igraci) < 11:
-                raise ValidationError("Minimalno 11 igrača mora biti odabrano.")
-            if len(igraci) > 18:
-                raise ValidationError("Maksimalno 18 igrača može biti odabrano.")
-            if kapetan and kapetan not in igraci:
-                raise ValidationError("Kapetan mora biti jedan od odabranih igrača.")
-        return cleaned_data
+class LineupPlayersView(View):
+    """Players of one category for the match lineup selector, a page at a time."""
+    paginate_by = 50
+
+    def get(self, request):
+        players = Player.objects.filter(kategorija=request.GET.get('kategorija', ''))
+        query = request.GET.get('q', '').strip()
+        if query:
+            search = Q(ime__icontains=query) | Q(prezime__icontains=query)
+            if query.isdigit():
+                search |= Q(broj_dresa=int(query))
+            players = players.filter(search)
+        players = players.order_by('broj_dresa', 'prezime', 'pk').values('id', 'ime', 'prezime', 'broj_dresa', 'pozicija')
+        page = Paginator(players, self.paginate_by).get_page(request.GET.get('page'))
+        return JsonResponse({
+            'results': list(page.object_list),
+            'page': page.number,
+            'has_next': page.has_next(),
+        })
 
 # MATCH
-class MatchListView(ListView):
+class MatchListView(ListPageMixin, ListView):
     model = Match
     template_name = 'main/matches/match_list.html'
+    ordering = ('-datum', '-pk')
+    select_related = ('kapetan',)
+    search_fields = ('protivnik', 'lokacija')
 
 class MatchDetailView(DetailView):
     model = Match
@@ -122,10 +148,55 @@ class StatisticsDeleteView(DeleteView):
     template_name = 'main/statistics/statistics_confirm_delete.html'
     success_url = reverse_lazy('main:match-list')
 
+class MatchStatisticsView(DetailView):
+    """Statistics of the whole lineup entered and saved in one request."""
+    model = Match
+    template_name = 'main/statistics/statistics_grid.html'
+
+    def get_formset(self):
+        queryset = (
+            Statistics.objects.filter(utakmica=self.object)
+            .select_related('igrac')
+            .order_by('igrac__prezime', 'igrac__ime')
+        )
+        return StatisticsFormSet(self.request.POST or None, queryset=queryset)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return self.render_to_response(self.get_context_data(formset=self.get_formset()))
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        formset = self.get_formset()
+        if not formset.is_valid():
+            return self.render_to_response(self.get_context_data(formset=formset))
+        if formset.save():
+            # bulk_update does not send post_save, so the leaderboards are
+            # invalidated here.
+            bump_statistics_version()
+        return redirect('main:match-detail', pk=self.object.pk)
+
+# STATISTIKA SEZONE
+class StatsDashboardView(TemplateView):
+    template_name = 'main/statistics/stats_dashboard.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = StatsFilterForm(self.request.GET or None)
+        filters = form.cleaned_data if form.is_valid() else {}
+        context['form'] = form
+        context['leaderboards'] = season_leaderboards(
+            filters.get('kategorija'), filters.get('od'), filters.get('do')
+        )
+        return context
+
 # STAFF
-class StaffListView(ListView):
+class StaffListView(ListPageMixin, ListView):
     model = StaffMember
     template_name = 'main/staff/staff_list.html'
+    ordering = ('ime', 'pk')
+    search_fields = ('ime',)
+    filter_fields = ('funkcija',)
 
 class StaffDetailView(DetailView):
     model = StaffMember
@@ -149,9 +220,11 @@ class StaffDeleteView(DeleteView):
     success_url = reverse_lazy('main:staff-list')
 
 # MEETING
-class MeetingListView(ListView):
+class MeetingListView(ListPageMixin, ListView):
     model = Meeting
     template_name = 'main/meetings/meeting_list.html'
+    ordering = ('-datum', '-pk')
+    search_fields = ('zapisnik',)
 
 class MeetingDetailView(DetailView):
     model = Meeting
@@ -175,9 +248,12 @@ class MeetingDeleteView(DeleteView):
     success_url = reverse_lazy('main:meeting-list')
 
 # EQUIPMENT
-class EquipmentListView(ListView):
+class EquipmentListView(ListPageMixin, ListView):
     model = Equipment
     template_name = 'main/equipment/equipment_list.html'
+    ordering = ('naziv', 'pk')
+    search_fields = ('naziv',)
+    filter_fields = ('kategorija',)
 
 class EquipmentDetailView(DetailView):
     model = Equipment
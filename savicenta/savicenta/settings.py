@@ -10,22 +10,31 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+# Production deployments override these through DJANGO_* environment variables.
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-tx6lbu2y^@p*xw073fdsj^d5ua=uaji6v+egbh#)3k(osclg%k'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-tx6lbu2y^@p*xw073fdsj^d5ua=uaji6v+egbh#)3k(osclg%k')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', True)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -74,12 +83,54 @@ WSGI_APPLICATION = 'savicenta.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default, PostgreSQL with DJANGO_DB_ENGINE=postgresql.
+
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+CONN_MAX_AGE = int(os.environ.get('DJANGO_CONN_MAX_AGE', '600'))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'savicenta'),
+            'USER': os.environ.get('DJANGO_DB_USER', 'savicenta'),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    # A pool (DJANGO_DB_POOL) cannot be combined with CONN_MAX_AGE.
+    if env_bool('DJANGO_DB_POOL'):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', '10')),
+        }
+else:
+    # The database is created locally and not kept in git, so it always runs
+    # in WAL mode (pages keep reading while match statistics are saved).
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_PRAGMAS = [
+        'PRAGMA journal_mode=WAL;',
+        'PRAGMA synchronous=NORMAL;',
+        f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};',
+        'PRAGMA mmap_size=134217728;',
+    ]
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ''.join(SQLITE_PRAGMAS),
+            },
+        }
     }
-}
 
 
 # Password validation